@@ -1,20 +1,44 @@
-from flask import Blueprint, jsonify, Response, current_app
+from flask import Blueprint, jsonify, Response, current_app, request
 import os
 import time
-from app.utils.gesture_engine import engine
+from app.utils.engine_manager import engine_manager, DEFAULT_KIOSK
+from app.utils.stream_renditions import AdaptiveStream, rendition_name
+from app.utils.gesture_actions import sse_format
+from app.utils.webrtc_stream import webrtc_manager, webrtc_available, ViewerLimitError, CODECS
+import queue
 
 gestures_bp = Blueprint('gestures', __name__)
 
+def get_kiosk_id():
+    """kiosk_id from the query string or JSON body; the default kiosk if omitted."""
+    data = request.get_json(silent=True) or {}
+    return request.args.get('kiosk_id') or data.get('kiosk_id') or DEFAULT_KIOSK
+
+def unknown_kiosk(kiosk_id):
+    return jsonify({'success': False, 'error': f"Unknown kiosk '{kiosk_id}'"}), 404
+
+@gestures_bp.route('/engines', methods=['GET'])
+def list_engines():
+    """All configured kiosk engines with their state and limits."""
+    return jsonify({
+        'success': True,
+        'max_engines': engine_manager.max_engines,
+        'engines': engine_manager.status()
+    })
+
 @gestures_bp.route('/start', methods=['POST'])
 def start_gestures():
+    kiosk_id = get_kiosk_id()
+    if engine_manager.get(kiosk_id) is None:
+        return unknown_kiosk(kiosk_id)
     try:
-        success = engine.start()
+        success, error = engine_manager.start(kiosk_id)
         if success:
-            return jsonify({'success': True, 'message': 'Gesture control started'})
+            return jsonify({'success': True, 'message': 'Gesture control started', 'kiosk_id': kiosk_id})
         else:
             return jsonify({
-                'success': False, 
-                'error': 'Could not start camera. Ensure it is not being used by the browser or another app.'
+                'success': False,
+                'error': error
             }), 500
     except Exception as e:
         return jsonify({
@@ -24,33 +48,170 @@ def start_gestures():
 
 @gestures_bp.route('/stop', methods=['POST'])
 def stop_gestures():
-    engine.stop()
-    return jsonify({'success': True, 'message': 'Gesture control stopped'})
+    kiosk_id = get_kiosk_id()
+    if not engine_manager.stop(kiosk_id):
+        return unknown_kiosk(kiosk_id)
+    return jsonify({'success': True, 'message': 'Gesture control stopped', 'kiosk_id': kiosk_id})
 
 @gestures_bp.route('/status', methods=['GET'])
 def get_status():
+    kiosk_id = get_kiosk_id()
+    engine = engine_manager.get(kiosk_id)
+    if engine is None:
+        return unknown_kiosk(kiosk_id)
+    return jsonify({
+        'success': True,
+        'kiosk_id': kiosk_id,
+        'is_running': engine.is_running,
+        'power_mode': engine.power_mode,
+        'capture': engine.supervisor.state
+    })
+
+@gestures_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Engine hot-path metrics: frame counters, stage latencies and stream subscriber lag."""
+    kiosk_id = get_kiosk_id()
+    engine = engine_manager.get(kiosk_id)
+    if engine is None:
+        return unknown_kiosk(kiosk_id)
+    return jsonify({
+        'success': True,
+        'metrics': engine.get_metrics()
+    })
+
+@gestures_bp.route('/latency', methods=['GET'])
+def get_latency():
+    """Capture-to-send and capture-to-action latency distributions (ms) for a kiosk."""
+    kiosk_id = get_kiosk_id()
+    engine = engine_manager.get(kiosk_id)
+    if engine is None:
+        return unknown_kiosk(kiosk_id)
     return jsonify({
-        'success': True, 
-        'is_running': engine.is_running
+        'success': True,
+        'kiosk_id': kiosk_id,
+        'latency': engine.latency_report()
     })
 
-def gen_frames():
-    """Video streaming generator function."""
-    while engine.is_running:
-        frame = engine.get_frame()
-        if frame is None:
-            time.sleep(0.01)
-            continue
-        
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-        time.sleep(0.01)
+def gen_frames(engine, rendition='kiosk', adaptive=True):
+    """Video streaming generator function. Blocks until a new frame exists, never resends one."""
+    stream = AdaptiveStream(engine.renditions, rendition, adaptive=adaptive)
+    try:
+        while engine.is_running:
+            part = stream.next_part(timeout=1.0)
+            if part is None:
+                continue
+            yield part
+            # Resumed once the server asks for the next chunk, i.e. this one has been written out
+            if stream.last_timestamp is not None:
+                engine.metrics.observe('capture_to_send', time.time() - stream.last_timestamp)
+    finally:
+        stream.close()
 
 @gestures_bp.route('/video_feed')
 def video_feed():
-    """Video streaming route. Put this in the src attribute of an img tag."""
+    """Video streaming route. Put this in the src attribute of an img tag.
+
+    Query params: kiosk_id (default kiosk if omitted),
+    rendition=kiosk|preview|thumbnail (default kiosk), or camera: the MJPG camera's own frames
+    forwarded without decoding or re-encoding (no overlay, NOT mirrored: flip it with CSS scaleX(-1)),
+    overlay=0 for the clean frame without hand landmarks drawn (default 1),
+    adaptive=0 to disable stepping down when the client falls behind.
+    """
+    kiosk_id = get_kiosk_id()
+    engine = engine_manager.get(kiosk_id)
+    if engine is None:
+        return unknown_kiosk(kiosk_id)
+
+    name = request.args.get('rendition', 'kiosk')
+    available = [r.name for r in engine.renditions.values() if not r.overlay]
+    if name not in available:
+        return jsonify({
+            'success': False,
+            'error': f"Unknown rendition '{name}'. Available: {', '.join(available)}"
+        }), 400
+    if not engine.renditions[name].passthrough:
+        name = rendition_name(name, overlay=request.args.get('overlay', '1') != '0')
+    adaptive = request.args.get('adaptive', '1') != '0'
+
+    # WebRTC peers that are still connecting hold a slot too
+    viewers = engine.subscriber_count() + webrtc_manager.pending_count(kiosk_id)
+    if engine.max_viewers and viewers >= engine.max_viewers:
+        return jsonify({'success': False, 'error': 'Viewer limit reached for this kiosk'}), 429
+
     if not engine.is_running:
-        engine.start() # Autostart if feed requested
-        
-    return Response(gen_frames(),
+        engine_manager.start(kiosk_id) # Autostart if feed requested
+
+    # Only known once the source is open
+    if engine.renditions[name].passthrough and not engine.passthrough:
+        return jsonify({'success': False, 'error': 'This camera does not deliver MJPEG for passthrough'}), 400
+
+    return Response(gen_frames(engine, name, adaptive),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@gestures_bp.route('/webrtc/offer', methods=['POST'])
+def webrtc_offer():
+    """WebRTC live view signaling: POST the browser's offer, get the answer back (no trickle ICE).
+
+    JSON body: sdp, type ('offer'), kiosk_id, codec=h264|vp8 (default h264), scale (0.1..1, default 1),
+    max_fps. Works on a LAN without STUN/TURN: create the RTCPeerConnection with iceServers: [] and
+    wait for ICE gathering to complete before posting the offer. The stream is the clean, mirrored
+    frame; the bitrate follows the browser's bandwidth estimate. Needs aiortc on the server.
+    """
+    if not webrtc_available():
+        return jsonify({'success': False, 'error': 'WebRTC support requires aiortc (pip install aiortc)'}), 501
+
+    kiosk_id = get_kiosk_id()
+    engine = engine_manager.get(kiosk_id)
+    if engine is None:
+        return unknown_kiosk(kiosk_id)
+
+    data = request.get_json(silent=True) or {}
+    if not data.get('sdp'):
+        return jsonify({'success': False, 'error': 'sdp is required'}), 400
+    codec = data.get('codec', 'h264').lower()
+    if codec not in CODECS:
+        return jsonify({'success': False, 'error': f"codec must be one of {', '.join(CODECS)}"}), 400
+    try:
+        scale = min(max(float(data.get('scale', 1.0)), 0.1), 1.0)
+        max_fps = float(data['max_fps']) if data.get('max_fps') else None
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'scale and max_fps must be numbers'}), 400
+
+    if not engine.is_running:
+        engine_manager.start(kiosk_id)
+
+    try:
+        answer = webrtc_manager.answer(engine, data['sdp'], data.get('type', 'offer'),
+                                       codec=codec, scale=scale, max_fps=max_fps)
+    except ViewerLimitError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'WebRTC error: {str(e)}'}), 500
+    return jsonify({'success': True, 'kiosk_id': kiosk_id, **answer})
+
+def gen_events(engine):
+    """Server-sent events generator: one event per dispatched gesture, keepalive comments in between."""
+    q = engine.actions.subscribe()
+    try:
+        while engine.is_running:
+            try:
+                event = q.get(timeout=15)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            yield sse_format(event)
+    finally:
+        engine.actions.unsubscribe(q)
+
+@gestures_bp.route('/events')
+def gesture_events():
+    """Low-latency gesture stream for the kiosk browser (EventSource). Events: move (x, y in 0..1), click."""
+    kiosk_id = get_kiosk_id()
+    engine = engine_manager.get(kiosk_id)
+    if engine is None:
+        return unknown_kiosk(kiosk_id)
+    if not engine.is_running:
+        engine_manager.start(kiosk_id)
+
+    return Response(gen_events(engine), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
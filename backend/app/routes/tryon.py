@@ -1,10 +1,11 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response
 import os
 import base64
 import time
 from app.utils.tryon_engine import tryon_engine
-from app.utils.gesture_engine import engine
-from app.utils.pose_analyzer import pose_analyzer
+from app.utils.engine_manager import engine_manager
+from app.utils.gesture_engine import SNAPSHOT_FORMATS
+from app.utils.pose_analyzer import PoseAnalyzer
 from app.utils.narrator import narrator
 
 tryon_bp = Blueprint('tryon', __name__)
@@ -24,23 +25,86 @@ def init_space():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def snapshot_params():
+    """format (jpeg/webp/png) and quality (1-100, default 95) for capture requests."""
+    data = request.get_json(silent=True) or {}
+    fmt = str(request.args.get('format') or data.get('format') or 'jpeg').lower()
+    fmt = 'jpeg' if fmt == 'jpg' else fmt
+    quality = int(request.args.get('quality') or data.get('quality') or 95)
+    return fmt, max(1, min(100, quality))
+
+def snapshot_etag(engine, seq, captured_at, fmt, quality):
+    # seq is only unique per process; the capture time keeps tags distinct across restarts
+    return f"{engine.kiosk_id}-{seq}-{int(captured_at * 1000)}-{fmt}-q{quality}"
+
+@tryon_bp.route('/capture', methods=['GET'])
+def capture_snapshot():
+    """Newest clean camera frame as binary image bytes (no landmark overlay, no base64).
+
+    Query params: kiosk_id, format=jpeg|webp|png (default jpeg), quality (default 95).
+    Carries an ETag for the frame; If-None-Match on an unchanged frame gets a 304 without encoding.
+    """
+    engine = engine_manager.get(request.args.get('kiosk_id'))
+    if engine is None:
+        return jsonify({'success': False, 'error': 'Unknown kiosk'}), 404
+    if not engine.is_running:
+        return jsonify({'success': False, 'error': 'Camera is not running'}), 400
+    try:
+        fmt, quality = snapshot_params()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'quality must be an integer'}), 400
+    if fmt not in SNAPSHOT_FORMATS:
+        return jsonify({'success': False, 'error': f"Unknown format '{fmt}'. Available: {', '.join(SNAPSHOT_FORMATS)}"}), 400
+
+    latest = engine.frames.latest()
+    if latest is None:
+        return jsonify({'success': False, 'error': 'No frame available'}), 503
+    etag = snapshot_etag(engine, latest[0], latest[1], fmt, quality)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    snapshot = engine.get_snapshot(fmt, quality)
+    if snapshot is None:
+        return jsonify({'success': False, 'error': 'No frame available'}), 503
+    seq, captured_at, data, mime = snapshot
+    response = Response(data, mimetype=mime)
+    response.set_etag(snapshot_etag(engine, seq, captured_at, fmt, quality))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Frame-Seq'] = str(seq)
+    response.headers['X-Captured-At'] = f"{captured_at:.3f}"
+    return response
+
 @tryon_bp.route('/capture', methods=['POST'])
 def capture_frame():
-    """Captures the current frame from the gesture engine's camera."""
+    """Legacy JSON capture: the same clean snapshot as GET /capture, base64-encoded. Prefer GET."""
     try:
+        data = request.get_json(silent=True) or {}
+        engine = engine_manager.get(data.get('kiosk_id') or request.args.get('kiosk_id'))
+        if engine is None:
+            return jsonify({'success': False, 'error': 'Unknown kiosk'}), 404
         if not engine.is_running:
             return jsonify({'success': False, 'error': 'Camera is not running'}), 400
-        
-        frame = engine.get_frame()
-        if frame is None:
+
+        try:
+            fmt, quality = snapshot_params()
+        except ValueError:
+            return jsonify({'success': False, 'error': 'quality must be an integer'}), 400
+        if fmt not in SNAPSHOT_FORMATS:
+            return jsonify({'success': False, 'error': f"Unknown format '{fmt}'"}), 400
+        snapshot = engine.get_snapshot(fmt, quality)
+        if snapshot is None:
             return jsonify({'success': False, 'error': 'No frame available'}), 500
-        
-        # Frame is already JPEG bytes from engine.get_frame()
+
+        seq, captured_at, frame, mime = snapshot
         b64_frame = base64.b64encode(frame).decode('utf-8')
         return jsonify({
             'success': True,
             'image_b64': b64_frame,
-            'mime': 'image/jpeg'
+            'mime': mime,
+            'frame_seq': seq,
+            'captured_at': captured_at
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -52,23 +116,34 @@ def analyze_pose():
         data = request.json or {}
         step = data.get('step', 'FRONT')
         
+        engine = engine_manager.get(data.get('kiosk_id') or request.args.get('kiosk_id'))
+        if engine is None:
+            return jsonify({'success': False, 'error': 'Unknown kiosk'}), 404
         if not engine.is_running:
             return jsonify({'success': False, 'error': 'Camera is not running'}), 400
         
-        frame = engine.get_frame_raw()
-        if frame is None:
-            return jsonify({'success': False, 'error': 'No frame available'}), 500
-        
         selected_upper = data.get('selected_upper', False)
         selected_lower = data.get('selected_lower', False)
         
-        # Analyze with step and clothing context
-        analysis = pose_analyzer.analyze_frame(
-            frame, 
-            step=step, 
-            selected_upper=selected_upper, 
-            selected_lower=selected_lower
-        )
+        # Pose detection runs inside the engine; here we only evaluate the cached result
+        pose = engine.get_pose()
+        if pose is None:
+            analysis = {
+                "status": "waiting",
+                "feedback": "Adjusting...",
+                "parts_visible": 0
+            }
+        else:
+            frame_seq, captured_at, landmarks = pose
+            # Analyze with step and clothing context
+            analysis = PoseAnalyzer.evaluate(
+                landmarks, 
+                step=step, 
+                selected_upper=selected_upper, 
+                selected_lower=selected_lower
+            )
+            analysis['frame_seq'] = frame_seq
+            analysis['captured_at'] = captured_at
         
         # Get AI Narrator instruction
         instruction = narrator.get_instruction(step)
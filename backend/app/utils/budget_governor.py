@@ -0,0 +1,104 @@
+import time
+from collections import deque
+import numpy as np
+
+# Quality ladder, best first. capture_scale is relative to the engine's configured capture size.
+# Level 2 matches the fixed settings the engine used before the governor existed.
+LEVELS = [
+    {'hand_complexity': 1, 'pose_complexity': 2, 'hand_stride': 1, 'capture_scale': 1.0},
+    {'hand_complexity': 1, 'pose_complexity': 1, 'hand_stride': 1, 'capture_scale': 1.0},
+    {'hand_complexity': 0, 'pose_complexity': 1, 'hand_stride': 1, 'capture_scale': 1.0},
+    {'hand_complexity': 0, 'pose_complexity': 0, 'hand_stride': 1, 'capture_scale': 1.0},
+    {'hand_complexity': 0, 'pose_complexity': 0, 'hand_stride': 2, 'capture_scale': 1.0},
+    {'hand_complexity': 0, 'pose_complexity': 0, 'hand_stride': 2, 'capture_scale': 0.75},
+    {'hand_complexity': 0, 'pose_complexity': 0, 'hand_stride': 3, 'capture_scale': 0.5},
+]
+DEFAULT_LEVEL = 2
+
+
+class BudgetGovernor:
+    """Walks the LEVELS ladder to keep capture-to-result latency under a target.
+
+    The engine feeds it the latency of every hand result (capture time to landmarks,
+    so queueing, capture work and model time all count). Every `interval` seconds
+    the p90 is compared with target_ms: above it the governor steps one level
+    down; well below it (under `headroom` x target for `patience` windows in a
+    row) it steps one level up. After a change the next window is skipped so the
+    new settings can settle. Decisions are kept for reporting.
+    """
+
+    def __init__(self, target_ms=50.0, level=DEFAULT_LEVEL, interval=3.0, min_samples=10,
+                 headroom=0.6, patience=2, history=20):
+        self.target_ms = target_ms
+        self.level = level
+        self.interval = interval
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self.patience = patience
+        self.samples = []
+        self.window_start = None
+        self.settling = False
+        self.calm_windows = 0
+        self.last_p90_ms = None
+        self.decisions = deque(maxlen=history)
+
+    @property
+    def enabled(self):
+        return bool(self.target_ms)
+
+    def settings(self):
+        return LEVELS[self.level]
+
+    def observe(self, latency, now=None):
+        """Records one result latency (seconds). Returns the new settings when the level changes, else None."""
+        if not self.enabled:
+            return None
+        now = now or time.time()
+        if self.window_start is None:
+            self.window_start = now
+        self.samples.append(latency)
+        if now - self.window_start < self.interval or len(self.samples) < self.min_samples:
+            return None
+
+        p90_ms = float(np.percentile(self.samples, 90)) * 1000
+        self.samples = []
+        self.window_start = now
+        self.last_p90_ms = round(p90_ms, 2)
+        if self.settling:
+            self.settling = False
+            return None
+
+        if p90_ms > self.target_ms and self.level < len(LEVELS) - 1:
+            self.calm_windows = 0
+            return self._step(self.level + 1, now, f"p90 {p90_ms:.0f}ms over the {self.target_ms:.0f}ms target")
+        if p90_ms < self.target_ms * self.headroom and self.level > 0:
+            self.calm_windows += 1
+            if self.calm_windows >= self.patience:
+                self.calm_windows = 0
+                return self._step(self.level - 1, now, f"p90 {p90_ms:.0f}ms well under the {self.target_ms:.0f}ms target")
+        else:
+            self.calm_windows = 0
+        return None
+
+    def _step(self, level, now, reason):
+        self.decisions.append({'at': now, 'from': self.level, 'to': level, 'reason': reason,
+                               'settings': LEVELS[level]})
+        self.level = level
+        self.settling = True
+        return LEVELS[level]
+
+    def reset_window(self):
+        """Drops the current window, e.g. after the engine restarts."""
+        self.samples = []
+        self.window_start = None
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'target_ms': self.target_ms,
+            'level': self.level,
+            'levels': len(LEVELS),
+            'settings': self.settings(),
+            'last_p90_ms': self.last_p90_ms,
+            'decisions': list(self.decisions)
+        }
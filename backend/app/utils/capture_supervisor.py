@@ -0,0 +1,94 @@
+import threading
+import time
+
+
+class CaptureSupervisor:
+    """Capture health for an engine: decides how long to wait after a failed read and when to reopen.
+
+    Health is 'ok' while reads succeed, 'degraded' after degraded_after consecutive
+    failures (retried with a growing pause instead of spinning), and 'reconnecting'
+    once reconnect_after failures in a row mean the device is gone. Reopen attempts
+    back off exponentially from backoff_initial to backoff_max seconds.
+    """
+
+    OK = 'ok'
+    DEGRADED = 'degraded'
+    RECONNECTING = 'reconnecting'
+
+    def __init__(self, degraded_after=3, reconnect_after=10, retry_delay=0.01, max_retry_delay=0.5,
+                 backoff_initial=0.5, backoff_max=30.0):
+        self.degraded_after = degraded_after
+        self.reconnect_after = reconnect_after
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.wake = threading.Event()
+        self.reset()
+
+    def reset(self):
+        """Fresh state for a newly opened source."""
+        self.wake.clear()
+        self.state = self.OK
+        self.failures = 0
+        self.attempts = 0  # Reopen attempts since the device was lost
+        self.reconnects = 0
+        self.last_ok_at = None
+        self.last_failure_at = None
+        self.lost_at = None
+
+    def success(self, now):
+        self.state = self.OK
+        self.failures = 0
+        self.last_ok_at = now
+
+    def failure(self, now):
+        """Records a failed read. Returns 'reconnect' when the source should be reopened, else 'retry'."""
+        self.failures += 1
+        self.last_failure_at = now
+        if self.failures >= self.reconnect_after:
+            if self.state != self.RECONNECTING:
+                self.state = self.RECONNECTING
+                self.lost_at = now
+                self.attempts = 0
+            return 'reconnect'
+        if self.failures >= self.degraded_after:
+            self.state = self.DEGRADED
+        return 'retry'
+
+    def retry_pause(self):
+        """Pause before the next read; doubles with every consecutive failure."""
+        return min(self.retry_delay * 2 ** (self.failures - 1), self.max_retry_delay)
+
+    def next_backoff(self):
+        """Delay before the next reopen attempt; counts the attempt."""
+        delay = min(self.backoff_initial * 2 ** self.attempts, self.backoff_max)
+        self.attempts += 1
+        return delay
+
+    def reconnected(self, now):
+        self.reconnects += 1
+        self.failures = 0
+        self.attempts = 0
+        self.state = self.OK
+        self.last_ok_at = now
+        self.lost_at = None
+
+    def sleep(self, seconds):
+        """Sleeps unless interrupted by interrupt(); returns True if interrupted."""
+        return self.wake.wait(seconds)
+
+    def interrupt(self):
+        """Cuts any pending pause short, e.g. when the engine is stopping."""
+        self.wake.set()
+
+    def status(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'reconnect_attempts': self.attempts,
+            'reconnects': self.reconnects,
+            'last_ok_at': self.last_ok_at,
+            'last_failure_at': self.last_failure_at,
+            'lost_for': round(time.time() - self.lost_at, 1) if self.lost_at else None
+        }
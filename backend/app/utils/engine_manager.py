@@ -0,0 +1,126 @@
+import os
+import threading
+from app.utils.gesture_engine import GestureEngine
+
+DEFAULT_KIOSK = 'default'
+
+
+class EngineManager:
+    """Registry of independent GestureEngines, one per kiosk/camera, keyed by kiosk_id.
+
+    Kiosks are configured up front (KIOSK_SOURCES env var or register()); the
+    manager never opens a camera for an unknown kiosk_id. max_engines caps how
+    many engines may run at once on this box.
+    """
+
+    def __init__(self, max_engines=4):
+        self.max_engines = max_engines
+        self.engines = {}
+        self.lock = threading.Lock()
+
+    def register(self, kiosk_id, source=None, **engine_kwargs):
+        """Adds (or returns the existing) engine for kiosk_id. engine_kwargs go to GestureEngine."""
+        with self.lock:
+            if kiosk_id not in self.engines:
+                self.engines[kiosk_id] = GestureEngine(source=source, kiosk_id=kiosk_id, **engine_kwargs)
+            return self.engines[kiosk_id]
+
+    def get(self, kiosk_id=None):
+        """Returns the engine for kiosk_id (default kiosk if empty), or None if it is not configured."""
+        with self.lock:
+            return self.engines.get(kiosk_id or DEFAULT_KIOSK)
+
+    def running_count(self):
+        with self.lock:
+            return sum(1 for e in self.engines.values() if e.is_running)
+
+    def start(self, kiosk_id=None):
+        """Starts a kiosk's engine. Returns (success, error message)."""
+        engine = self.get(kiosk_id)
+        if engine is None:
+            return False, f"Unknown kiosk '{kiosk_id}'"
+        if engine.is_running:
+            return True, None
+        if self.running_count() >= self.max_engines:
+            return False, f'Engine limit reached ({self.max_engines} running)'
+        if not engine.start():
+            return False, 'Could not start camera. Ensure it is not being used by the browser or another app.'
+        return True, None
+
+    def stop(self, kiosk_id=None):
+        engine = self.get(kiosk_id)
+        if engine is None:
+            return False
+        engine.stop()
+        return True
+
+    def stop_all(self):
+        with self.lock:
+            engines = list(self.engines.values())
+        for engine in engines:
+            engine.stop()
+
+    def status(self):
+        with self.lock:
+            engines = dict(self.engines)
+        return [
+            {
+                'kiosk_id': kiosk_id,
+                'is_running': engine.is_running,
+                'power_mode': engine.power_mode,
+                'capture': engine.supervisor.state,
+                'source': engine.source if isinstance(engine.source, str) or engine.source is None
+                else engine.source.describe(),
+                'subscribers': engine.subscriber_count(),
+                'limits': engine.limits()
+            }
+            for kiosk_id, engine in engines.items()
+        ]
+
+
+def parse_kiosk_sources(value):
+    """Parses 'kiosk-1=camera:0;kiosk-2=camera:1' into {'kiosk-1': 'camera:0', ...}."""
+    sources = {}
+    for entry in (value or '').split(';'):
+        kiosk_id, sep, spec = entry.strip().partition('=')
+        if sep and kiosk_id.strip():
+            sources[kiosk_id.strip()] = spec.strip() or None
+    return sources
+
+
+def create_manager():
+    """Builds the shared manager from the environment.
+
+    CAMERA_SOURCE configures the default kiosk (which also drives the OS mouse).
+    KIOSK_SOURCES adds more kiosks; those never move the mouse, since they share the box.
+    Unset and empty variables both mean the default.
+    """
+    manager = EngineManager(max_engines=int(os.getenv('MAX_ENGINES') or 4))
+    options = {
+        'max_fps': float(os.getenv('ENGINE_MAX_FPS') or 0) or None,
+        'max_viewers': int(os.getenv('ENGINE_MAX_VIEWERS') or 0) or None,
+        'inference_mode': os.getenv('INFERENCE_MODE') or 'thread',
+        'hand_stride': int(os.getenv('HAND_STRIDE') or 1),
+        'idle_after': float(os.getenv('ENGINE_IDLE_AFTER') or 15),
+        'scan_fps': float(os.getenv('ENGINE_SCAN_FPS') or 2),
+        'release_after': float(os.getenv('ENGINE_RELEASE_AFTER') or 300),
+        'jpeg_encoder': os.getenv('JPEG_ENCODER') or 'auto',
+        'jpeg_subsampling': os.getenv('JPEG_SUBSAMPLING') or '420',
+        'jpeg_optimize': os.getenv('JPEG_OPTIMIZE', '0') == '1',
+        'jpeg_max_bytes': int(os.getenv('JPEG_MAX_BYTES') or 0) or None,
+        'infer_width': int(os.getenv('INFER_WIDTH') or 320),
+        'cpu_budget': float(os.getenv('INFERENCE_CPU_BUDGET') or 1.0),
+        'reconnect_after': int(os.getenv('CAPTURE_RECONNECT_AFTER') or 10),
+        'reconnect_backoff_max': float(os.getenv('CAPTURE_BACKOFF_MAX') or 30),
+        'target_latency_ms': float(os.getenv('GOVERNOR_TARGET_MS') or 60) or None,
+        'motion_gate': os.getenv('MOTION_GATE', '1') != '0',
+        'motion_static_fps': float(os.getenv('MOTION_STATIC_FPS') or 1)
+    }
+    manager.register(DEFAULT_KIOSK, source=os.getenv('CAMERA_SOURCE') or None, **options)
+    for kiosk_id, spec in parse_kiosk_sources(os.getenv('KIOSK_SOURCES')).items():
+        manager.register(kiosk_id, source=spec, mouse_control=False, **options)
+    return manager
+
+
+# Global registry for shared use across requests
+engine_manager = create_manager()
@@ -0,0 +1,101 @@
+import bisect
+import time
+
+# Bucket upper bounds in seconds: 0.25 ms .. ~4 s, roughly 12% apart
+LATENCY_BUCKETS = [0.00025 * (1.12 ** i) for i in range(86)]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram. Recording is a bisect plus two adds, no locks.
+
+    Under heavy contention an increment can occasionally be lost; that is fine
+    for diagnostics and keeps the hot path cheap.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (seconds)."""
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+
+class EngineMetrics:
+    """Per-stage latency histograms and frame counters for one GestureEngine.
+
+    Counters are always kept (plain integer adds); histograms are only fed
+    while enabled.
+    """
+
+    COUNTERS = ('captured', 'processed', 'dropped', 'encoded', 'read_failures')
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started_at = time.time()
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.stages = {}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages.setdefault(stage, LatencyHistogram())
+        hist.observe(seconds)
+
+    def summary(self, stage):
+        hist = self.stages.get(stage)
+        return hist.summary() if hist is not None else {'count': 0}
+
+    def reset(self):
+        self.started_at = time.time()
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.stages = {}
+
+    def snapshot(self):
+        uptime = time.time() - self.started_at
+        counters = dict(self.counters)
+        return {
+            'enabled': self.enabled,
+            'uptime_s': round(uptime, 1),
+            'counters': counters,
+            'rates_fps': {
+                name: round(counters[name] / uptime, 2) if uptime else 0.0
+                for name in ('captured', 'processed', 'encoded')
+            },
+            'stages': {name: hist.summary() for name, hist in list(self.stages.items())}
+        }
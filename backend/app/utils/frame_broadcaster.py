@@ -0,0 +1,115 @@
+import threading
+import time
+
+
+class FrameSubscription:
+    """One viewer of a FrameBroadcaster. Remembers the last frame it was given."""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.last_seq = 0
+        self.last_timestamp = None  # Capture time of the last frame handed out
+        self.sent = 0
+        self.skipped = 0
+        self.created_at = time.time()
+        self.closed = False
+
+    def next_part(self, timeout=1.0):
+        """Blocks until a frame newer than the last one sent exists. Returns the multipart chunk or None."""
+        latest = self.broadcaster.wait_newer(self.last_seq, timeout=timeout)
+        if latest is None or self.closed:
+            return None
+        seq, timestamp, part = latest
+        self.last_timestamp = timestamp
+        if self.last_seq:
+            self.skipped += max(0, seq - self.last_seq - 1)
+        self.last_seq = seq
+        self.sent += 1
+        return part
+
+    def lag(self):
+        """Number of frames published since this subscriber was last served."""
+        return max(0, self.broadcaster.seq - self.last_seq)
+
+    def close(self):
+        self.closed = True
+        self.broadcaster.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameBroadcaster:
+    """Encode-once, fan-out publisher for MJPEG streams.
+
+    Every published JPEG gets a sequence number and is wrapped into its
+    multipart chunk once; all subscribers share that buffer and block on a
+    condition until a newer frame exists, so nobody is sent duplicates.
+    """
+
+    def __init__(self, boundary=b'frame'):
+        self.boundary = boundary
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.frame = None
+        self.part = None
+        self.timestamp = None
+        self.subscribers = []
+
+    def publish(self, jpeg, timestamp=None, frame_seq=None):
+        """Publishes one encoded JPEG (bytes or any buffer, e.g. the cv2.imencode array).
+
+        timestamp is the capture time of the frame; it goes into the part headers
+        (X-Capture-Time, plus X-Frame-Seq if given) so clients can measure latency.
+        """
+        jpeg = memoryview(jpeg)
+        timestamp = timestamp or time.time()
+        headers = f'Content-Type: image/jpeg\r\nContent-Length: {jpeg.nbytes}\r\nX-Capture-Time: {timestamp:.6f}\r\n'
+        if frame_seq is not None:
+            headers += f'X-Frame-Seq: {frame_seq}\r\n'
+        header = b'--' + self.boundary + b'\r\n' + headers.encode() + b'\r\n'
+        # Single allocation: the multipart chunk; the JPEG itself is a view into it
+        part = b''.join((header, jpeg, b'\r\n'))
+        with self.cond:
+            self.seq += 1
+            self.frame = memoryview(part)[len(header):-2]
+            self.part = part
+            self.timestamp = timestamp
+            self.cond.notify_all()
+            return self.seq
+
+    def latest(self):
+        """Returns a copy of the newest JPEG bytes, or None."""
+        with self.cond:
+            return bytes(self.frame) if self.frame is not None else None
+
+    def wait_newer(self, after_seq, timeout=1.0):
+        """Blocks until seq > after_seq. Returns (seq, timestamp, part) or None on timeout/shutdown."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > after_seq, timeout=timeout):
+                return None
+            return self.seq, self.timestamp, self.part
+
+    def subscribe(self):
+        sub = FrameSubscription(self)
+        with self.cond:
+            self.subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self.cond:
+            if sub in self.subscribers:
+                self.subscribers.remove(sub)
+            self.cond.notify_all()
+
+    def subscriber_count(self):
+        with self.cond:
+            return len(self.subscribers)
+
+    def wake_all(self):
+        """Releases blocked subscribers, e.g. when the engine is stopping."""
+        with self.cond:
+            self.cond.notify_all()
@@ -0,0 +1,126 @@
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+
+
+class FrameRing:
+    """Small ring of preallocated frame buffers holding the newest camera frames.
+
+    The capture thread writes straight into a free slot (see writable/commit),
+    so steady-state capture allocates nothing. Consumers only ever look at the
+    newest frame and get a read-only view of it; a slot is leased while a
+    consumer works on it and is never overwritten underneath them. The
+    sequence number doubles as the generation counter for each slot.
+    """
+
+    def __init__(self, size=4):
+        self.size = size
+        self.buffers = [None] * size
+        self.meta = [None] * size  # (seq, timestamp) per slot
+        self.leases = [0] * size
+        self.newest = -1
+        self.seq = 0
+        self.cond = threading.Condition()
+
+    def writable(self, shape, dtype=np.uint8):
+        """Returns (index, buffer) for a slot that is neither the newest frame nor leased.
+
+        The buffer is reused between frames and only (re)allocated when the frame shape changes.
+        """
+        with self.cond:
+            for offset in range(1, len(self.buffers) + 1):
+                index = (self.newest + offset) % len(self.buffers)
+                if index != self.newest and self.leases[index] == 0:
+                    break
+            else:
+                # Every slot is busy: grow instead of overwriting a frame someone is reading
+                self.buffers.append(None)
+                self.meta.append(None)
+                self.leases.append(0)
+                index = len(self.buffers) - 1
+
+            buf = self.buffers[index]
+            if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+                buf = np.empty(shape, dtype=dtype)
+                self.buffers[index] = buf
+            # Invalidate the slot until it is committed again
+            self.meta[index] = None
+            return index, buf
+
+    def commit(self, index, timestamp=None, seq=None):
+        """Marks a slot filled via writable() as the newest frame. Returns its sequence number.
+
+        seq lets the caller keep its own numbering (e.g. the capture sequence, which may skip
+        frames that were never decoded); it must increase. By default the ring counts up by one.
+        """
+        with self.cond:
+            self.seq = seq if seq is not None and seq > self.seq else self.seq + 1
+            self.meta[index] = (self.seq, timestamp or time.time())
+            self.newest = index
+            self.cond.notify_all()
+            return self.seq
+
+    def publish(self, frame, timestamp=None):
+        """Copies a frame into the ring. Prefer writable()/commit() on the hot path."""
+        index, buf = self.writable(frame.shape, frame.dtype)
+        np.copyto(buf, frame)
+        return self.commit(index, timestamp)
+
+    def _entry(self, index):
+        seq, timestamp = self.meta[index]
+        view = self.buffers[index].view()
+        view.flags.writeable = False
+        return seq, timestamp, view
+
+    def latest(self):
+        """Returns (seq, timestamp, read-only view) of the newest frame, or None.
+
+        The view is only guaranteed stable until the ring wraps; use lease_newer() or snapshot()
+        when holding on to it.
+        """
+        with self.cond:
+            if self.newest < 0:
+                return None
+            return self._entry(self.newest)
+
+    def snapshot(self):
+        """Returns (seq, timestamp, private copy) of the newest frame, or None."""
+        with self.cond:
+            if self.newest < 0:
+                return None
+            seq, timestamp = self.meta[self.newest]
+            return seq, timestamp, self.buffers[self.newest].copy()
+
+    @contextmanager
+    def lease_newer(self, after_seq, timeout=1.0):
+        """Waits for a frame newer than after_seq and leases its slot for the duration of the block.
+
+        Yields (seq, timestamp, read-only view), or None on timeout/shutdown.
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > after_seq, timeout=timeout):
+                index = None
+            else:
+                index = self.newest
+                self.leases[index] += 1
+        if index is None:
+            yield None
+            return
+        try:
+            yield self._entry(index)
+        finally:
+            with self.cond:
+                self.leases[index] -= 1
+
+    def wait_newer(self, after_seq, timeout=1.0):
+        """Blocks until a frame newer than after_seq exists and returns the newest one (or None on timeout)."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > after_seq, timeout=timeout):
+                return None
+            return self._entry(self.newest)
+
+    def wake_all(self):
+        """Releases blocked waiters, e.g. when the engine is stopping."""
+        with self.cond:
+            self.cond.notify_all()
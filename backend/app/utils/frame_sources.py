@@ -0,0 +1,355 @@
+import os
+import time
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """Where GestureEngine gets its frames from. Mirrors the bits of cv2.VideoCapture the engine uses.
+
+    Subclasses implement _open() and _read(); pacing for replayed sources is
+    handled here (realtime=True plays back at the source fps, False runs as
+    fast as possible).
+    """
+
+    name = 'source'
+    passthrough = False  # True when read_jpeg() hands out the source's own JPEG bytes
+
+    def __init__(self, fps=30.0, realtime=True, loop=True):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.finished = False  # True once a non-looping replay ran out of frames
+        self.opened = False
+        self._next_due = None
+
+    def open(self):
+        self.finished = False
+        self._next_due = None
+        self.opened = self._open()
+        return self.opened
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        if not self.opened:
+            return False, None
+        if self.realtime and self.fps:
+            self._pace()
+        return self._read(image)
+
+    def read_jpeg(self):
+        """Next frame as the source's encoded JPEG bytes (1-D uint8 array), undecoded. Passthrough sources only."""
+        if not self.opened:
+            return False, None
+        if self.realtime and self.fps:
+            self._pace()
+        return self._read_jpeg()
+
+    def release(self):
+        self.opened = False
+
+    def describe(self):
+        return {'type': self.name, 'fps': self.fps, 'realtime': self.realtime}
+
+    def _pace(self):
+        now = time.time()
+        if self._next_due is None:
+            self._next_due = now
+        elif now < self._next_due:
+            time.sleep(self._next_due - now)
+        self._next_due = max(self._next_due + 1.0 / self.fps, time.time() - 1.0 / self.fps)
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _read(self, image):
+        raise NotImplementedError
+
+    def _read_jpeg(self):
+        raise NotImplementedError
+
+
+TIMECODE_BITS = 38  # Milliseconds modulo 2**38 (~8.7 years), plus a white and a black guard block
+
+
+def draw_timecode(image, t):
+    """Stamps wall-clock time t as a black/white block barcode along the top edge (see read_timecode)."""
+    block = image.shape[1] // (TIMECODE_BITS + 2)
+    code = int(t * 1000) % (1 << TIMECODE_BITS)
+    bits = [1] + [(code >> i) & 1 for i in range(TIMECODE_BITS - 1, -1, -1)] + [0]
+    for i, bit in enumerate(bits):
+        image[:block, i * block:(i + 1) * block] = 255 if bit else 0
+
+
+def read_timecode(image, now=None):
+    """Time stamped by draw_timecode into image (a decoded frame, mirrored or not), or None.
+
+    Survives JPEG compression and the engine's mirroring; scaled-down renditions need
+    blocks of a few pixels at least.
+    """
+    h, w = image.shape[:2]
+    block = w // (TIMECODE_BITS + 2)
+    if block < 2:
+        return None
+    row = image[block // 2].reshape(w, -1).mean(axis=1) > 127
+    centers = [i * block + block // 2 for i in range(TIMECODE_BITS + 2)]
+    for xs in (centers, [w - 1 - x for x in centers]):  # As drawn, then mirrored
+        bits = [bool(row[x]) for x in xs]
+        if bits[0] and not bits[-1]:
+            code = 0
+            for bit in bits[1:-1]:
+                code = (code << 1) | bit
+            now_ms = int((now or time.time()) * 1000)
+            return (now_ms - (now_ms - code) % (1 << TIMECODE_BITS)) / 1000.0
+    return None
+
+
+def is_jpeg(buf):
+    """True if buf starts with the JPEG SOI marker."""
+    return buf is not None and buf.size > 2 and buf.reshape(-1)[0] == 0xFF and buf.reshape(-1)[1] == 0xD8
+
+
+def decode_jpeg(buf):
+    """Decodes a JPEG byte buffer to a BGR frame (None if it is not a valid image)."""
+    if not isinstance(buf, np.ndarray):
+        buf = np.frombuffer(buf, np.uint8)
+    return cv2.imdecode(buf.reshape(-1), cv2.IMREAD_COLOR)
+
+
+class CameraSource(FrameSource):
+    """Live webcam via cv2.VideoCapture. The camera paces itself.
+
+    With mjpeg=True the camera is asked for MJPG and, if the backend hands out
+    the undecoded buffers, the source runs in passthrough mode: read_jpeg()
+    returns the camera's own JPEG bytes and read() decodes them.
+    """
+
+    name = 'camera'
+
+    def __init__(self, device=0, width=640, height=480, mjpeg=True):
+        super().__init__(fps=None, realtime=False)
+        self.device = device
+        self.width, self.height = width, height
+        self.mjpeg = mjpeg
+        self.passthrough = False
+        self.cap = None
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.device)
+        if not self.cap.isOpened():
+            print("Camera failed to open via cv2")
+            self.cap.release()
+            return False
+        fourcc = cv2.VideoWriter_fourcc(*'MJPG')
+        if self.mjpeg:
+            # FOURCC goes before the frame size; some drivers reset the format otherwise
+            self.cap.set(cv2.CAP_PROP_FOURCC, fourcc)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Minimize buffer delay
+        self.passthrough = self.mjpeg and int(self.cap.get(cv2.CAP_PROP_FOURCC)) == fourcc \
+            and self._enable_passthrough()
+        return True
+
+    def _enable_passthrough(self):
+        """Turns off backend decoding; keeps it off only if the camera really delivers JPEG bytes."""
+        if self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+            success, buf = self.cap.read()
+            if success and buf.ndim <= 2 and is_jpeg(buf):
+                return True
+            self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        return False
+
+    def _read(self, image):
+        if self.passthrough:
+            success, buf = self.cap.read()
+            frame = decode_jpeg(buf) if success else None
+            return frame is not None, frame
+        return self.cap.read(image)
+
+    def _read_jpeg(self):
+        success, buf = self.cap.read()
+        if not success or buf is None:
+            return False, None
+        return True, buf.reshape(-1)
+
+    def release(self):
+        super().release()
+        if self.cap:
+            self.cap.release()
+        self.cap = None
+
+    def describe(self):
+        return {'type': self.name, 'device': self.device, 'width': self.width, 'height': self.height,
+                'passthrough': self.passthrough}
+
+
+class VideoFileSource(FrameSource):
+    """Replays a recorded clip, in real time or as fast as possible, optionally looping."""
+
+    name = 'video'
+
+    def __init__(self, path, realtime=True, loop=True):
+        super().__init__(realtime=realtime, loop=loop)
+        self.path = path
+        self.cap = None
+
+    def _open(self):
+        if not os.path.exists(self.path):
+            print(f"Video source not found: {self.path}")
+            return False
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return True
+
+    def _read(self, image):
+        success, frame = self.cap.read(image)
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self.cap.read(image)
+        if not success:
+            self.finished = True
+        return success, frame
+
+    def release(self):
+        super().release()
+        if self.cap:
+            self.cap.release()
+        self.cap = None
+
+    def describe(self):
+        return dict(super().describe(), path=self.path, loop=self.loop)
+
+
+class ImageDirectorySource(FrameSource):
+    """Plays the images of a directory in name order, like a clip."""
+
+    name = 'images'
+    extensions = ('.jpg', '.jpeg', '.png', '.bmp')
+
+    def __init__(self, path, fps=30.0, realtime=True, loop=True):
+        super().__init__(fps=fps, realtime=realtime, loop=loop)
+        self.path = path
+        self.files = []
+        self.index = 0
+
+    def _open(self):
+        if not os.path.isdir(self.path):
+            print(f"Image source not found: {self.path}")
+            return False
+        self.files = sorted(
+            os.path.join(self.path, f) for f in os.listdir(self.path)
+            if f.lower().endswith(self.extensions)
+        )
+        self.index = 0
+        return len(self.files) > 0
+
+    def _read(self, image):
+        if self.index >= len(self.files):
+            if not self.loop:
+                self.finished = True
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.files[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+    def describe(self):
+        return dict(super().describe(), path=self.path, frames=len(self.files), loop=self.loop)
+
+
+class SyntheticSource(FrameSource):
+    """Generated test pattern (moving bar plus frame counter) for machines without a camera.
+
+    mjpeg=True makes it behave like an MJPG webcam (passthrough JPEG bytes);
+    timecode=True stamps each frame's capture time into its pixels (draw_timecode)
+    for end-to-end latency tests.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, width=640, height=480, fps=30.0, realtime=True, frames=None, mjpeg=False, timecode=False):
+        super().__init__(fps=fps, realtime=realtime, loop=frames is None)
+        self.width, self.height = width, height
+        self.frames = frames  # Stop after this many frames (None = endless)
+        self.passthrough = mjpeg
+        self.timecode = timecode
+        self.count = 0
+        self.background = None
+        self.render_buf = None
+
+    def _open(self):
+        self.count = 0
+        # Static colour gradient, rendered once
+        xs = np.linspace(0, 255, self.width, dtype=np.uint8)
+        ys = np.linspace(0, 255, self.height, dtype=np.uint8)
+        self.background = np.empty((self.height, self.width, 3), np.uint8)
+        self.background[..., 0] = xs[None, :]
+        self.background[..., 1] = ys[:, None]
+        self.background[..., 2] = 96
+        return True
+
+    def _read(self, image):
+        if self.frames is not None and self.count >= self.frames:
+            self.finished = True
+            return False, None
+        if image is None or image.shape != self.background.shape:
+            image = np.empty_like(self.background)
+        np.copyto(image, self.background)
+        bar_x = (self.count * 8) % self.width
+        image[:, bar_x:bar_x + 24] = 255
+        cv2.putText(image, str(self.count), (20, self.height - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+        if self.timecode:
+            draw_timecode(image, time.time())
+        self.count += 1
+        return True, image
+
+    def _read_jpeg(self):
+        success, self.render_buf = self._read(self.render_buf)
+        if not success:
+            return False, None
+        success, buf = cv2.imencode('.jpg', self.render_buf, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        return success, buf.reshape(-1) if success else None
+
+    def describe(self):
+        return dict(super().describe(), width=self.width, height=self.height, passthrough=self.passthrough)
+
+
+def make_frame_source(spec=None, width=640, height=480):
+    """Builds a FrameSource from a spec string (e.g. the CAMERA_SOURCE env var).
+
+    camera[:<device>][?mjpeg=0]       live webcam (default camera:0); mjpeg=0 skips MJPG passthrough
+    video:<path>[?realtime=0&loop=0]  recorded clip
+    images:<dir>[?fps=15&realtime=0]  directory of frames
+    synthetic[?fps=30&realtime=0]     generated test pattern; mjpeg=1 acts as an MJPG camera,
+                                      timecode=1 stamps the capture time into the pixels
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    spec = (spec or 'camera:0').strip()
+    kind, _, rest = spec.partition(':')
+    if '?' in kind:
+        kind, _, query = kind.partition('?')
+        rest = '?' + query
+    target, _, query = rest.partition('?')
+    opts = dict(pair.split('=', 1) for pair in query.split('&') if '=' in pair)
+    realtime = opts.get('realtime', '1') != '0'
+    loop = opts.get('loop', '1') != '0'
+
+    if kind == 'camera':
+        device = int(target) if target.isdigit() else (target or 0)
+        return CameraSource(device, width, height, mjpeg=opts.get('mjpeg', '1') != '0')
+    if kind == 'video':
+        return VideoFileSource(target, realtime=realtime, loop=loop)
+    if kind == 'images':
+        return ImageDirectorySource(target, fps=float(opts.get('fps', 30)), realtime=realtime, loop=loop)
+    if kind == 'synthetic':
+        frames = int(opts['frames']) if 'frames' in opts else None
+        return SyntheticSource(width, height, fps=float(opts.get('fps', 30)), realtime=realtime, frames=frames,
+                               mjpeg=opts.get('mjpeg', '0') == '1', timecode=opts.get('timecode', '0') == '1')
+    raise ValueError(f"Unknown frame source '{spec}'")
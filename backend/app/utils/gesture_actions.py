@@ -0,0 +1,132 @@
+import json
+import queue
+import threading
+import time
+
+
+class GestureDispatcher:
+    """Turns gestures from the vision loop into output without ever blocking it.
+
+    The vision loop only calls move()/click(), which store the event and return
+    immediately. A dispatcher thread delivers them: moves are coalesced (only
+    the newest position matters), clicks are debounced, and everything is sent
+    to the OS cursor via pyautogui (if mouse_control) and to event-stream
+    subscribers (SSE for the kiosk browser).
+    """
+
+    def __init__(self, mouse_control=True, click_debounce=0.3, metrics=None):
+        self.mouse_control = mouse_control
+        self.click_debounce = click_debounce
+        self.metrics = metrics
+        self.cond = threading.Condition()
+        self.pending_move = None
+        self.pending_clicks = []
+        self.last_click_at = 0.0
+        self.subscribers = []
+        self.thread = None
+        self.is_running = False
+        self.pyautogui = None
+        self.screen = None
+
+    def start(self):
+        with self.cond:
+            if self.is_running:
+                return
+            self.is_running = True
+        if self.mouse_control and self.pyautogui is None:
+            self._init_mouse()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.is_running = False
+            self.cond.notify_all()
+
+    def _init_mouse(self):
+        # Imported lazily: headless boxes (no display) can still run engines without mouse control
+        try:
+            import pyautogui
+            # Disable pyautogui failsafe (moving mouse to corner won't stop script)
+            pyautogui.FAILSAFE = False
+            self.pyautogui = pyautogui
+            self.screen = pyautogui.size()
+        except Exception as e:
+            print(f"Mouse control unavailable: {e}")
+            self.mouse_control = False
+
+    # Called from the vision loop: store and return, never block
+
+    def move(self, x, y, seq=None, captured_at=None):
+        """Cursor position in normalised [0, 1] screen coordinates."""
+        with self.cond:
+            self.pending_move = {'type': 'move', 'x': x, 'y': y, 'seq': seq, 'captured_at': captured_at}
+            self.cond.notify()
+
+    def click(self, seq=None, captured_at=None):
+        now = time.time()
+        with self.cond:
+            if now - self.last_click_at < self.click_debounce:
+                return
+            self.last_click_at = now
+            self.pending_clicks.append({'type': 'click', 'seq': seq, 'captured_at': captured_at})
+            self.cond.notify()
+
+    # Event stream subscribers
+
+    def subscribe(self, maxsize=64):
+        q = queue.Queue(maxsize=maxsize)
+        with self.cond:
+            self.subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.cond:
+            if q in self.subscribers:
+                self.subscribers.remove(q)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(
+                    lambda: not self.is_running or self.pending_move is not None or self.pending_clicks,
+                    timeout=1.0
+                )
+                if not self.is_running:
+                    break
+                move, self.pending_move = self.pending_move, None
+                clicks, self.pending_clicks = self.pending_clicks, []
+                subscribers = list(self.subscribers)
+
+            for event in ([move] if move else []) + clicks:
+                self._deliver(event, subscribers)
+
+    def _deliver(self, event, subscribers):
+        if self.mouse_control and self.pyautogui is not None:
+            try:
+                if event['type'] == 'move':
+                    self.pyautogui.moveTo(event['x'] * self.screen[0], event['y'] * self.screen[1])
+                else:
+                    self.pyautogui.click()
+            except Exception:
+                pass
+
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # Slow consumer: drop its oldest event rather than block or grow
+                try:
+                    q.get_nowait()
+                    q.put_nowait(event)
+                except (queue.Empty, queue.Full):
+                    pass
+
+        if self.metrics is not None:
+            self.metrics.count(f"gesture_{event['type']}")
+            if event.get('captured_at'):
+                self.metrics.observe('capture_to_action', time.time() - event['captured_at'])
+
+
+def sse_format(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -1,29 +1,159 @@
 import cv2
 import numpy as np
 from app.utils.hand_tracking import HandDetector
+from app.utils.frame_sources import make_frame_source, decode_jpeg
+from app.utils.engine_metrics import EngineMetrics
+from app.utils.inference_workers import RemoteHandDetector, RemotePoseAnalyzer
+from app.utils.gesture_actions import GestureDispatcher
+from app.utils.landmark_filter import LandmarkPredictor
+from app.utils.frame_ring import FrameRing
+from app.utils.stream_renditions import default_renditions
+from app.utils.pose_analyzer import PoseAnalyzer
+from app.utils.jpeg_encoders import make_encoder
+from app.utils.inference_scheduler import InferenceScheduler
+from app.utils.capture_supervisor import CaptureSupervisor
+from app.utils.budget_governor import BudgetGovernor
+from app.utils.motion_gate import MotionGate
 import time
-import pyautogui
 import threading
+from collections import deque
+
+# Snapshot formats: cv2 extension, MIME type and the quality flag (None = lossless)
+SNAPSHOT_FORMATS = {
+    'jpeg': ('.jpg', 'image/jpeg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', 'image/webp', cv2.IMWRITE_WEBP_QUALITY),
+    'png': ('.png', 'image/png', None)
+}
+
+def make_model_input(img, width=None):
+    """RGB copy of a BGR frame for the models, downscaled to width px wide (None/0 = full size)."""
+    h, w = img.shape[:2]
+    if width and width < w:
+        small = cv2.resize(img, (width, int(round(h * width / w))), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=small)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-# Disable pyautogui failsafe (moving mouse to corner won't stop script)
-pyautogui.FAILSAFE = False
 
 class GestureEngine:
-    def __init__(self):
+    def __init__(self, source=None, kiosk_id='default', pose_fps=5, pose_demand_window=3.0,
+                 metrics_enabled=True, mouse_control=True,
+                 max_fps=None, max_viewers=None, inference_mode='thread', hand_stride=1,
+                 idle_after=15.0, scan_fps=2.0, release_after=300.0,
+                 jpeg_encoder='auto', jpeg_subsampling='420', jpeg_optimize=False, jpeg_max_bytes=None,
+                 infer_width=320,
+                 cpu_budget=1.0, reconnect_after=10, reconnect_backoff_max=30.0, target_latency_ms=60.0,
+                 motion_gate=True, motion_static_fps=1.0):
+        self.source = source  # FrameSource or spec string (see make_frame_source); None = webcam 0
+        self.kiosk_id = kiosk_id
+        self.mouse_control = mouse_control  # Only one engine per box should drive the OS cursor
+
+        # Per-engine resource limits (None = unlimited)
+        self.max_fps = max_fps
+        self.max_viewers = max_viewers
+        self.peer_viewers = 0  # WebRTC live views (see webrtc_stream), counted with the MJPEG subscribers
+
+        # 'thread' runs MediaPipe in this process; 'process' moves each model into a worker process
+        self.inference_mode = inference_mode
+
+        # Power management: drop to scan_fps after idle_after s without a hand/person,
+        # release the camera after release_after s without any subscriber (0 = never)
+        self.idle_after = idle_after
+        self.scan_fps = scan_fps
+        self.release_after = release_after
+        self.power_mode = 'active'
+        self.last_activity_at = 0.0
+        self.last_subscriber_at = 0.0
         self.cap = None
+        # Watches read failures: backs off instead of spinning and reopens a camera that went away
+        self.supervisor = CaptureSupervisor(reconnect_after=reconnect_after, backoff_max=reconnect_backoff_max)
         self.detector = None
         self.is_running = False
         self.thread = None
         self.lock = threading.Lock()
-        self.current_frame = None
-        self.last_raw_frame = None
+
+        # Reused between frames so steady-state capture does not allocate
+        self.read_buf = None
+        self.overlay_buf = None  # Landmarks are drawn on this copy, never on the captured frame
+        self.frame_times = deque(maxlen=300)  # Capture-to-capture intervals, for jitter checks
+
+        # MJPG cameras: the camera's JPEG is forwarded as-is and only decoded every hand_stride frames
+        # for inference (plus whenever a re-encoded rendition needs pixels)
+        self.passthrough = False
+        self.frames_since_decode = 0  # Frames since the last decode for inference; rendering decodes don't count
+
+        # Capture publishes every frame here; inference only ever takes the newest one
+        self.frames = FrameRing(size=4)
+        self.last_inferred_seq = 0
+        self.capture_seq = 0  # Every captured frame gets one, decoded or not; stamped on stream parts
+
+        # Run the hand model every hand_stride captured frames and predict landmarks in between.
+        # The governor may raise the stride, never below the configured one
+        self.hand_stride = hand_stride
+        self.min_hand_stride = hand_stride
+        self.predictor = LandmarkPredictor()
+        self.last_detect_seq = 0
+
+        # Static scene: the hand model only samples it at motion_static_fps, any motion passes at once
+        self.motion_gate = MotionGate(enabled=motion_gate, static_fps=motion_static_fps)
+
+        # Models see one shared RGB copy per frame, downscaled to infer_width px (0 = full size);
+        # full resolution is only used for streaming and captures
+        self.infer_width = infer_width
+        self.model_input = None  # (seq, rgb)
+        self.model_input_lock = threading.Lock()
+
+        # Hot-path counters and per-stage latency histograms, served by /api/gestures/metrics
+        self.metrics = EngineMetrics(enabled=metrics_enabled)
+
+        # Named stream outputs (kiosk/preview/thumbnail), encoded only while someone watches
+        self.renditions = default_renditions()
+
+        # JPEG backend (opencv/pil/turbojpeg/simplejpeg); 'auto' benchmarks them on the first frame and
+        # takes the fastest one that meets the quality and (jpeg_max_bytes per kiosk frame) size target
+        self.jpeg_encoder = jpeg_encoder
+        self.jpeg_subsampling = jpeg_subsampling
+        self.jpeg_optimize = jpeg_optimize
+        self.jpeg_max_bytes = jpeg_max_bytes
+        self.encoder = None
+        self.snapshot_cache = None  # (seq, fmt, quality, data) of the last on-demand snapshot
+
+        # Pose runs in the pipeline at pose_fps while /analyze has been polled recently;
+        # the latest detection is cached as (frame seq, capture timestamp, landmarks)
+        self.pose_analyzer = None  # Own model instance per engine, created on start
+        self.pose_fps = pose_fps
+        self.pose_demand_window = pose_demand_window
+        self.pose_requested_at = 0.0
+        self.pose_result = None
+
+        # The scheduler owns the model stages: each runs on the newest frame at its own rate,
+        # and lower-priority stages are shed when model time exceeds cpu_budget (in cores)
+        self.scheduler = InferenceScheduler(self.frames, cpu_budget=cpu_budget, metrics=self.metrics)
+        self.scheduler.register('hands', self._run_hands, priority=0,
+                                target_fps=lambda: self.scan_fps if self.power_mode == 'idle' else None,
+                                prepare=self._prepare_hands)
+        self.scheduler.register('pose', self._run_pose, priority=1, target_fps=lambda: self.pose_fps,
+                                active=lambda: time.time() - self.pose_requested_at <= self.pose_demand_window,
+                                prepare=self._prepare_pose)
         
-        # Performance settings
+        # Performance settings. wCam/hCam follow the size the source actually delivers;
+        # base_capture is the configured size the governor scales from
         self.wCam, self.hCam = 640, 480
+        self.base_capture = (self.wCam, self.hCam)
+
+        # The governor trades model complexity, hand stride and capture size against capture-to-result
+        # latency (None = fixed settings). Its decisions are applied by the stage that owns each knob
+        self.governor = BudgetGovernor(target_ms=target_latency_ms)
+        self.hand_complexity = 0
+        self.pose_complexity = 1
+        self.capture_size = None  # (w, h) requested by the governor, applied by the capture loop
+        # Gesture geometry in pixels of a base_capture-wide frame, scaled to the delivered frame size
         self.frameR = 100
+        self.click_distance = 35
         self.smoothening = 5
         self.plocX, self.plocY = 0, 0
-        self.wScr, self.hScr = pyautogui.size()
+
+        # Gestures become events; the dispatcher drives pyautogui and the /events stream off the vision loop
+        self.actions = GestureDispatcher(mouse_control=mouse_control, metrics=self.metrics)
 
     def start(self):
         with self.lock:
@@ -31,90 +161,516 @@ class GestureEngine:
                 return True
             
             try:
-                self.cap = cv2.VideoCapture(0)
-                if not self.cap.isOpened():
-                    print("Camera failed to open via cv2")
+                self.cap = make_frame_source(self.source, self.wCam, self.hCam)
+                if not self.cap.open():
+                    print(f"Frame source failed to open: {self.cap.describe()}")
+                    self.cap = None
                     return False
-                
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.wCam)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.hCam)
-                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Minimize buffer delay
-                
-                self.detector = HandDetector(detectionCon=0.5, trackCon=0.5)
+                self.passthrough = self.cap.passthrough
+                self.frames_since_decode = 0
+                self.supervisor.reset()
+                self.governor.reset_window()
+                self.motion_gate.reset()
+
+                self._create_models()
+                self.actions.start()
+                self.power_mode = 'active'
+                self.last_activity_at = self.last_subscriber_at = time.time()
                 self.is_running = True
                 self.thread = threading.Thread(target=self._update, daemon=True)
                 self.thread.start()
+                self.scheduler.start()
                 return True
             except Exception as e:
                 print(f"Failed to start GestureEngine: {e}")
                 if self.cap:
                     self.cap.release()
                 self.is_running = False
+                self._close_models()
                 return False
 
+    def _create_models(self):
+        hand_options = dict(detectionCon=0.5, trackCon=0.5)
+        if self.inference_mode == 'process':
+            self.detector = RemoteHandDetector(**hand_options)
+            self.pose_analyzer = RemotePoseAnalyzer()
+        else:
+            self.detector = HandDetector(**hand_options)
+            self.pose_analyzer = PoseAnalyzer()
+
+    def _close_models(self):
+        for model in (self.detector, self.pose_analyzer):
+            if model is not None:
+                try:
+                    model.close()
+                except Exception as e:
+                    print(f"Engine model close error: {e}")
+
     def stop(self):
         with self.lock:
             self.is_running = False
             if self.cap:
                 self.cap.release()
             self.cap = None
+            self.supervisor.interrupt()
+            self.frames.wake_all()
+            for rendition in self.renditions.values():
+                rendition.broadcaster.wake_all()
+            self.actions.stop()
+
+        # Let the model stages finish their current frame before the models go away
+        self.scheduler.stop()
+        self._close_models()
 
     def _update(self):
+        """Capture loop: reads frames at camera rate and publishes them for streaming and inference."""
+        last_capture = None
         while self.is_running:
-            success, img = self.cap.read()
+            cap = self.cap
+            if cap is None:
+                break
+            if self._update_power_state(time.time()) == 'release':
+                print(f"No subscribers for {self.release_after:.0f}s, releasing camera for kiosk '{self.kiosk_id}'")
+                self.stop()
+                break
+            if self.capture_size is not None:
+                self._resize_capture(cap)
+                continue
+
+            # Nobody watching and nobody in front of the mirror: only read what the scan needs
+            max_fps = self.max_fps
+            if self.power_mode == 'idle' and not self.subscriber_count():
+                max_fps = min(max_fps or self.scan_fps, self.scan_fps)
+            if max_fps and last_capture is not None:
+                wait = last_capture + 1.0 / max_fps - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+
+            t0 = time.perf_counter()
+            if self.passthrough:
+                success, jpeg = cap.read_jpeg()
+            else:
+                success, frame = cap.read(self.read_buf)
+            t1 = time.perf_counter()
             if not success:
+                self.metrics.count('read_failures')
+                if cap.finished:
+                    print("Frame source finished, stopping GestureEngine")
+                    self.stop()
+                    break
+                if self.supervisor.failure(time.time()) == 'reconnect':
+                    self._reconnect(cap)
+                else:
+                    self.supervisor.sleep(self.supervisor.retry_pause())
                 continue
-            
-            img = cv2.flip(img, 1)
-            
+            self.supervisor.success(time.time())
+            self.metrics.count('captured')
+            self.metrics.observe('capture', t1 - t0)
+            now = time.time()
+            self.capture_seq += 1
+            seq = self.capture_seq
+            if last_capture is not None:
+                self.frame_times.append(now - last_capture)
+            last_capture = now
+
+            if self.passthrough:
+                frame = self._passthrough(jpeg, now, seq)
+                if frame is None:
+                    continue
+                t1 = time.perf_counter()
+            else:
+                self.read_buf = frame
+            if frame.shape[1] != self.wCam or frame.shape[0] != self.hCam:
+                # Cameras without the requested mode deliver their nearest one; map gestures in that
+                self.hCam, self.wCam = frame.shape[:2]
+
+            # Mirror straight into a free ring slot instead of allocating a new array
+            index, img = self.frames.writable(frame.shape, frame.dtype)
+            cv2.flip(frame, 1, dst=img)
+            self.frames.commit(index, now, seq)
+            t2 = time.perf_counter()
+            self.metrics.observe('flip', t2 - t1)
+
+            if self.encoder is None:
+                self._select_encoder(img)
+
+            # Encode each watched rendition once for all of its viewers. Clean renditions read the
+            # ring slot directly; the overlay is drawn on a copy only if an overlay stream is due
+            overlay_img = None
+            for rendition in self.renditions.values():
+                if rendition.passthrough or not rendition.is_due(now):
+                    continue
+                src = img
+                if rendition.overlay:
+                    if overlay_img is None:
+                        overlay_img = self._render_overlay(img)
+                    src = overlay_img
+                t4 = time.perf_counter()
+                if rendition.publish(src, now, seq) is not None:
+                    self.metrics.count('encoded')
+                    self.metrics.observe(f'encode_{rendition.name}', time.perf_counter() - t4)
+
+    def _reconnect(self, cap):
+        """Releases the frame source and reopens it with exponential backoff until it works or the engine stops."""
+        print(f"Capture for kiosk '{self.kiosk_id}' lost after {self.supervisor.failures} failed reads, reconnecting")
+        while self.is_running and self.cap is cap:
+            cap.release()
+            if self.supervisor.sleep(self.supervisor.next_backoff()):
+                return False
+            self.metrics.count('reconnect_attempts')
+            if not cap.open():
+                continue
+            if self.cap is not cap:  # Stopped while reopening
+                cap.release()
+                return False
+            self.passthrough = cap.passthrough
+            self.frames_since_decode = 0
+            self.read_buf = None
+            self.supervisor.reconnected(time.time())
+            self.metrics.count('reconnects')
+            print(f"Capture for kiosk '{self.kiosk_id}' reconnected: {cap.describe()}")
+            return True
+        return False
+
+    def _resize_capture(self, cap):
+        """Reopens the frame source at the governor's capture size. Replayed clips keep their own size."""
+        w, h = self.capture_size
+        self.capture_size = None
+        if not hasattr(cap, 'width') or (cap.width, cap.height) == (w, h):
+            return
+        cap.release()
+        cap.width, cap.height = w, h
+        opened = cap.open()
+        if self.cap is not cap:  # Stopped while reopening
+            cap.release()
+            return
+        self.passthrough = cap.passthrough
+        self.frames_since_decode = 0
+        self.read_buf = None
+        self.metrics.count('capture_resizes')
+        if not opened:
+            print(f"Capture for kiosk '{self.kiosk_id}' failed to reopen at {w}x{h}")
+
+    def _passthrough(self, jpeg, now, seq):
+        """Forwards the camera's JPEG to 'camera' viewers; decodes it only when pixels are needed.
+
+        Pixels are needed every hand_stride frames for inference, or whenever a re-encoded
+        rendition (mirrored, resized or with overlay) is due. Returns the frame or None.
+        Frames decoded only for rendering still go through the hand stage's stride, which
+        predicts on them instead of running the model.
+        """
+        camera = self.renditions['camera']
+        if camera.is_due(now) and camera.publish_encoded(jpeg, now, seq) is not None:
+            self.metrics.count('passthrough')
+        self.frames_since_decode += 1
+        inference_due = self.frames_since_decode >= self.hand_stride
+        needs_pixels = any(r.is_due(now) for r in self.renditions.values() if not r.passthrough)
+        if not inference_due and not needs_pixels:
+            return None
+        if inference_due:
+            self.frames_since_decode = 0
+        t0 = time.perf_counter()
+        frame = decode_jpeg(jpeg)
+        if frame is None:
+            self.metrics.count('read_failures')
+            return None
+        self.metrics.count('decoded')
+        self.metrics.observe('decode', time.perf_counter() - t0)
+        return frame
+
+    def _render_overlay(self, img):
+        """Copy of img with the most recent hand landmarks drawn; inference may lag a frame or two behind."""
+        t0 = time.perf_counter()
+        if self.overlay_buf is None or self.overlay_buf.shape != img.shape:
+            self.overlay_buf = np.empty_like(img)
+        np.copyto(self.overlay_buf, img)
+        try:
+            self.detector.drawHand(self.overlay_buf)
+        except Exception as e:
+            print(f"Engine overlay error: {e}")
+        self.metrics.observe('overlay', time.perf_counter() - t0)
+        return self.overlay_buf
+
+    def _select_encoder(self, sample):
+        """Picks the JPEG backend once (kept across restarts) and hands it to every rendition."""
+        try:
+            self.encoder = make_encoder(self.jpeg_encoder, sample, self.renditions['kiosk'].quality,
+                                        self.jpeg_subsampling, self.jpeg_optimize, self.jpeg_max_bytes)
+        except Exception as e:
+            print(f"JPEG encoder selection failed, using opencv: {e}")
+            self.encoder = make_encoder('opencv')
+        for rendition in self.renditions.values():
+            rendition.encoder = self.encoder
+
+    def frame_time_stats(self):
+        """Mean/stdev/max capture interval in ms over the recent window, to measure frame-time jitter."""
+        times = np.array(self.frame_times)
+        if times.size == 0:
+            return None
+        return {
+            'frames': int(times.size),
+            'mean_ms': float(times.mean() * 1000),
+            'stdev_ms': float(times.std() * 1000),
+            'max_ms': float(times.max() * 1000)
+        }
+
+    def _prepare_hands(self):
+        """Hand stage setup, outside its cost sample: complexity changes and (process mode) the worker start."""
+        if self.hand_complexity != self.detector.modelComplexity:
             try:
-                # Run hand tracking - enable drawing to see landmarks on stream
-                lmList = self.detector.getPosition(img, indexes=range(21), draw=True)
-                
-                if len(lmList) != 0:
-                    x1, y1 = lmList[8]  # Index finger tip
-                    index_up = lmList[8][1] < lmList[6][1]
-                    middle_up = lmList[12][1] < lmList[10][1]
-
-                    # Move Mouse
-                    if index_up and not middle_up:
-                        x3 = np.interp(x1, (self.frameR, self.wCam - self.frameR), (0, self.wScr))
-                        y3 = np.interp(y1, (self.frameR, self.hCam - self.frameR), (0, self.hScr))
-                        clocX = self.plocX + (x3 - self.plocX) / self.smoothening
-                        clocY = self.plocY + (y3 - self.plocY) / self.smoothening
-                        
-                        try:
-                            pyautogui.moveTo(clocX, clocY)
-                            self.plocX, self.plocY = clocX, clocY
-                        except:
-                            pass
-
-                    # Click
-                    elif index_up and middle_up:
-                        dist_bw = np.hypot(lmList[12][0] - x1, lmList[12][1] - y1)
-                        if dist_bw < 35: 
-                            try:
-                                pyautogui.click()
-                                time.sleep(0.2)
-                            except:
-                                pass
+                self.detector.setComplexity(self.hand_complexity)
             except Exception as e:
-                print(f"Engine update error: {e}")
+                print(f"Engine hand complexity {self.hand_complexity} unavailable, staying at "
+                      f"{self.detector.modelComplexity}: {e}")
+                self.hand_complexity = self.detector.modelComplexity
+        if self.inference_mode == 'process':
+            self.detector.start()
 
-            # Encode frame for streaming (lower quality = faster)
-            ret, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 70])
-            if ret:
-                with self.lock:
-                    self.current_frame = buffer.tobytes()
-                    self.last_raw_frame = img.copy()
+    def _run_hands(self, seq, captured_at, img):
+        """Hand stage (priority 0): landmarks for the newest frame, turned into gesture events."""
+        # Passthrough seqs also skip the frames that were never decoded, so only count in decode mode
+        if self.last_inferred_seq and not self.passthrough:
+            self.metrics.count('dropped', max(0, seq - self.last_inferred_seq - 1))
+        self.last_inferred_seq = seq
 
-    def get_frame(self):
+        t0 = time.perf_counter()
+        moved = self.motion_gate.allow(img, captured_at)
+        self.metrics.observe('motion_gate', time.perf_counter() - t0)
+        if not moved:
+            self.metrics.count('motion_skipped')
+            return
+        lmList = self._hand_landmarks(img, seq, captured_at)
+        self.metrics.count('processed')
+
+        if lmList:
+            self.note_activity()
+        self._handle_gesture(lmList, seq, captured_at)
+
+        # Scan mode is slow on purpose; only full-rate frames tell the governor anything
+        if self.power_mode == 'active':
+            settings = self.governor.observe(time.time() - captured_at)
+            if settings is not None:
+                self._apply_governor(settings)
+
+    def _apply_governor(self, settings):
+        """Applies a governor step.
+
+        Model complexities are picked up by each model stage before its next frame, and the
+        capture size by the capture loop.
+        """
+        decision = self.governor.decisions[-1]
+        print(f"Governor for kiosk '{self.kiosk_id}': level {decision['from']} -> {decision['to']} ({decision['reason']})")
+        self.metrics.count('governor_steps')
+        self.hand_complexity = settings['hand_complexity']
+        self.pose_complexity = settings['pose_complexity']
+        self.hand_stride = max(settings['hand_stride'], self.min_hand_stride)
+        w, h = self.base_capture
+        self.capture_size = (int(w * settings['capture_scale']), int(h * settings['capture_scale']))
+
+    def note_activity(self):
+        """A hand or person was seen: leave scan mode immediately."""
+        self.last_activity_at = time.time()
+        if self.power_mode != 'active':
+            self.power_mode = 'active'
+            self.metrics.count('wakeups')
+
+    def has_subscribers(self):
+        """Anyone consuming this engine: stream viewers, gesture event listeners or recent /analyze polls."""
+        return (self.subscriber_count() > 0
+                or len(self.actions.subscribers) > 0
+                or time.time() - self.pose_requested_at <= self.pose_demand_window)
+
+    def _update_power_state(self, now):
+        """Updates power_mode; returns 'release' once the engine should give up the camera."""
+        if self.has_subscribers():
+            self.last_subscriber_at = now
+        elif self.release_after and now - self.last_subscriber_at > self.release_after:
+            return 'release'
+        if self.idle_after and now - self.last_activity_at > self.idle_after:
+            self.power_mode = 'idle'
+        return self.power_mode
+
+    def _handle_gesture(self, lmList, seq, captured_at):
+        """Turns hand landmarks into move/click events for the dispatcher. Never blocks on output."""
+        if len(lmList) == 0:
+            return
+        x1, y1 = lmList[8]  # Index finger tip
+        index_up = lmList[8][1] < lmList[6][1]
+        middle_up = lmList[12][1] < lmList[10][1]
+
+        scale = self.wCam / self.base_capture[0]  # The governor may have shrunk the capture
+
+        # Move Mouse (normalised screen coordinates, smoothed)
+        if index_up and not middle_up:
+            frameR = self.frameR * scale
+            x3 = np.interp(x1, (frameR, self.wCam - frameR), (0, 1))
+            y3 = np.interp(y1, (frameR, self.hCam - frameR), (0, 1))
+            clocX = self.plocX + (x3 - self.plocX) / self.smoothening
+            clocY = self.plocY + (y3 - self.plocY) / self.smoothening
+            self.actions.move(float(clocX), float(clocY), seq, captured_at)
+            self.plocX, self.plocY = clocX, clocY
+
+        # Click
+        elif index_up and middle_up:
+            dist_bw = np.hypot(lmList[12][0] - x1, lmList[12][1] - y1)
+            if dist_bw < self.click_distance * scale:
+                self.actions.click(seq, captured_at)
+
+    def _hand_landmarks(self, img, seq, captured_at):
+        """Landmarks for this frame: predicted between strided detections, detected otherwise."""
+        # The stride counts captured frames (seq), so it holds whether every frame is decoded or,
+        # in passthrough mode without re-encoded viewers, only every hand_stride-th one
+        if self.hand_stride > 1 and seq - self.last_detect_seq < self.hand_stride:
+            predicted = self.predictor.predict(captured_at)
+            if predicted is not None:
+                self.metrics.count('predicted')
+                return predicted
+
+        t0 = time.perf_counter()
+        lmList = self._detect_hand(img, seq)
+        self.metrics.observe('hand_inference', time.perf_counter() - t0)
+        self.last_detect_seq = seq
+        if self.hand_stride > 1:
+            if lmList:
+                lmList = self.predictor.update(lmList, captured_at)
+            else:
+                self.predictor.reset()
+        return lmList
+
+    def _detect_hand(self, img, seq):
+        try:
+            h, w = img.shape[:2]
+            return self.detector.getPosition(self._model_input(seq, img), indexes=range(21),
+                                             rgb=True, frameSize=(w, h))
+        except Exception as e:
+            print(f"Engine update error: {e}")
+            return []
+
+    def _model_input(self, seq, img):
+        """The shared downscaled RGB copy of frame seq, built once by whichever model stage asks first."""
+        with self.model_input_lock:
+            cached = self.model_input
+            if cached is not None and cached[0] == seq:
+                return cached[1]
+            t0 = time.perf_counter()
+            rgb = make_model_input(img, self.infer_width)
+            self.metrics.observe('model_input', time.perf_counter() - t0)
+            # A stage lagging behind on an older frame must not evict the newest copy
+            if cached is None or seq > cached[0]:
+                self.model_input = (seq, rgb)
+            return rgb
+
+    def _prepare_pose(self):
+        """Pose stage setup, outside its cost sample: complexity changes and (process mode) the worker start."""
+        if self.pose_complexity != self.pose_analyzer.model_complexity:
+            try:
+                self.pose_analyzer.set_complexity(self.pose_complexity)
+            except Exception as e:
+                # Keep the working model; don't retry (and re-download) on every frame
+                print(f"Engine pose complexity {self.pose_complexity} unavailable, staying at "
+                      f"{self.pose_analyzer.model_complexity}: {e}")
+                self.pose_complexity = self.pose_analyzer.model_complexity
+        if self.inference_mode == 'process':
+            self.pose_analyzer.start()
+
+    def _run_pose(self, seq, timestamp, img):
+        """Pose stage (priority 1): runs at pose_fps while /analyze is being polled, shed first under load."""
+        t0 = time.perf_counter()
+        landmarks = self.pose_analyzer.detect(self._model_input(seq, img), rgb=True)
+        self.metrics.observe('pose_inference', time.perf_counter() - t0)
+        if landmarks:
+            self.note_activity()
         with self.lock:
-            return self.current_frame
+            self.pose_result = (seq, timestamp, landmarks)
 
-    def get_frame_raw(self):
+    def get_pose(self, max_age=1.0):
+        """Returns the cached (seq, timestamp, landmarks) pose result, or None if there is no fresh one.
+
+        Calling this also keeps the pose loop running for another pose_demand_window seconds.
+        """
+        self.pose_requested_at = time.time()
         with self.lock:
-            return self.last_raw_frame
+            result = self.pose_result
+        if result is None or time.time() - result[1] > max_age:
+            return None
+        return result
 
-# Global instance for shared use across requests
-engine = GestureEngine()
+    def subscriber_count(self):
+        return sum(r.broadcaster.subscriber_count() for r in self.renditions.values()) + self.peer_viewers
+
+    def limits(self):
+        return {'max_fps': self.max_fps, 'max_viewers': self.max_viewers}
+
+    def get_metrics(self):
+        """Counters, stage latencies, frame-time jitter and per-subscriber lag, as a JSON-able dict."""
+        snapshot = self.metrics.snapshot()
+        snapshot['kiosk_id'] = self.kiosk_id
+        snapshot['is_running'] = self.is_running
+        snapshot['power_mode'] = self.power_mode
+        snapshot['idle_s'] = round(time.time() - self.last_activity_at, 1) if self.last_activity_at else None
+        snapshot['frame_times'] = self.frame_time_stats()
+        snapshot['subscribers'] = {
+            name: [
+                {
+                    'lag_frames': sub.lag(),
+                    'sent': sub.sent,
+                    'skipped': sub.skipped,
+                    'connected_s': round(time.time() - sub.created_at, 1)
+                }
+                for sub in list(rendition.broadcaster.subscribers)
+            ]
+            for name, rendition in self.renditions.items()
+        }
+        snapshot['subscriber_count'] = sum(len(subs) for subs in snapshot['subscribers'].values())
+        snapshot['limits'] = self.limits()
+        snapshot['scheduler'] = self.scheduler.status()
+        snapshot['webrtc_viewers'] = self.peer_viewers
+        snapshot['capture'] = self.supervisor.status()
+        snapshot['governor'] = self.governor.status()
+        snapshot['motion_gate'] = self.motion_gate.status()
+        snapshot['jpeg_encoder'] = self.encoder.describe() if self.encoder else None
+        return snapshot
+
+    def latency_report(self):
+        """Glass-to-glass latency: capture to MJPEG part written out, capture to gesture action delivered."""
+        return {stage: self.metrics.summary(stage) for stage in ('capture_to_send', 'capture_to_action')}
+
+    def get_frame(self):
+        """Latest clean kiosk JPEG; encoded on demand when nobody is streaming the kiosk rendition."""
+        kiosk = self.renditions['kiosk']
+        if kiosk.is_active():
+            return kiosk.broadcaster.latest()
+        with self.frames.lease_newer(0, timeout=0) as latest:
+            if latest is None:
+                return None
+            jpeg = kiosk.encode(latest[2])
+        return bytes(jpeg) if jpeg is not None else None
+
+    def get_snapshot(self, fmt='jpeg', quality=95):
+        """Newest clean camera frame (mirrored, no overlay) encoded on demand.
+
+        Returns (seq, captured_at, bytes, mime) or None. The last encoding is cached,
+        so repeated requests for the same frame and settings cost nothing.
+        """
+        ext, mime, quality_flag = SNAPSHOT_FORMATS[fmt]
+        with self.frames.lease_newer(0, timeout=0) as latest:
+            if latest is None:
+                return None
+            seq, captured_at, img = latest
+            cached = self.snapshot_cache
+            if cached is not None and cached[:3] == (seq, fmt, quality):
+                return seq, captured_at, cached[3], mime
+            if fmt == 'jpeg' and self.encoder is not None:
+                data = bytes(self.encoder.encode(img, quality))
+            else:
+                ret, buffer = cv2.imencode(ext, img, [quality_flag, quality] if quality_flag else [])
+                if not ret:
+                    return None
+                data = buffer.tobytes()
+        self.snapshot_cache = (seq, fmt, quality, data)
+        return seq, captured_at, data, mime
+
+    def get_frame_raw(self):
+        """Copy of the latest clean (mirrored, no overlay) frame, for callers that keep it around."""
+        latest = self.frames.snapshot()
+        return latest[2] if latest is not None else None
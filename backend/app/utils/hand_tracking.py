@@ -10,27 +10,67 @@ class HandDetector:
         self.trackCon = trackCon
 
         self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands(
+        self.hands = self._createHands()
+        self.mpDraw = mp.solutions.drawing_utils
+        self.lastHand = None  # Landmarks of the most recent detection, for overlay drawing
+
+    def _createHands(self):
+        return self.mpHands.Hands(
             static_image_mode=self.mode,
             max_num_hands=self.maxHands,
             model_complexity=self.modelComplexity,
             min_detection_confidence=self.detectionCon,
             min_tracking_confidence=self.trackCon
         )
-        self.mpDraw = mp.solutions.drawing_utils
 
-    def getPosition(self, img, indexes=range(21), hand_no=0, draw=False):
+    def setComplexity(self, modelComplexity):
+        """Rebuilds the model at another complexity (0 = lite, 1 = full). Call from the thread that runs it.
+
+        The new model is built first (MediaPipe may have to download it); if that fails the
+        old model and complexity stay in place and the error is raised.
+        """
+        if modelComplexity == self.modelComplexity:
+            return
+        previous = self.modelComplexity
+        self.modelComplexity = modelComplexity
+        try:
+            hands = self._createHands()
+        except Exception:
+            self.modelComplexity = previous
+            raise
+        self.hands.close()
+        self.hands = hands
+
+    def getPosition(self, img, indexes=range(21), hand_no=0, draw=False, rgb=False, frameSize=None):
+        """Pixel positions of the requested landmarks of one hand ([] if none).
+
+        img is BGR, or an RGB model input with rgb=True (e.g. the engine's shared downscaled copy);
+        frameSize=(w, h) scales the returned positions to the full frame instead of img.
+        """
         lst = []
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        h, w, c = img.shape
+        fw, fh = frameSize or (w, h)
+        imgRGB = img if rgb else cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         results = self.hands.process(imgRGB)
-        if results.multi_hand_landmarks:
-            if len(results.multi_hand_landmarks) >= hand_no + 1:
-                myHand = results.multi_hand_landmarks[hand_no]
-                for id, lm in enumerate(myHand.landmark):
-                    if id in indexes:
-                        h, w, c = img.shape
-                        x, y = int(lm.x * w), int(lm.y * h)
-                        lst.append((x, y))
-                if draw:
-                    self.mpDraw.draw_landmarks(img, myHand, self.mpHands.HAND_CONNECTIONS)
+        myHand = None
+        if results.multi_hand_landmarks and len(results.multi_hand_landmarks) >= hand_no + 1:
+            myHand = results.multi_hand_landmarks[hand_no]
+
+        self.lastHand = myHand
+        if myHand is not None:
+            for id, lm in enumerate(myHand.landmark):
+                if id in indexes:
+                    x, y = int(lm.x * fw), int(lm.y * fh)
+                    lst.append((x, y))
+            if draw:
+                self.mpDraw.draw_landmarks(img, myHand, self.mpHands.HAND_CONNECTIONS)
         return lst
+
+    def drawHand(self, img, hand=None):
+        """Draws hand landmarks (defaults to the last detection) onto img in place."""
+        hand = hand if hand is not None else self.lastHand
+        if hand is not None:
+            self.mpDraw.draw_landmarks(img, hand, self.mpHands.HAND_CONNECTIONS)
+
+    def close(self):
+        self.hands.close()
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import deque
+
+
+class ModelTask:
+    """One model stage run by the InferenceScheduler.
+
+    run(seq, timestamp, img) gets the newest frame as a leased read-only view.
+    Priority 0 is never shed; higher numbers are shed first. target_fps (a number
+    or a callable, None = every new frame) caps the rate and active() gates
+    on-demand stages. prepare() runs before each frame outside the cost sample,
+    for setup such as model rebuilds or worker starts.
+    """
+
+    def __init__(self, name, run, priority=0, target_fps=None, active=None, prepare=None):
+        self.name = name
+        self.run = run
+        self.priority = priority
+        self.target_fps = target_fps
+        self.active = active
+        self.prepare = prepare
+        self.last_seq = 0
+        self.last_run_at = 0.0
+        self.runs = 0
+        self.shed = 0
+        self.cost = None  # Moving average of the run time, in seconds
+        self.thread = None
+
+    def rate(self):
+        return self.target_fps() if callable(self.target_fps) else self.target_fps
+
+    def status(self):
+        return {
+            'priority': self.priority,
+            'target_fps': self.rate(),
+            'active': self.active() if self.active is not None else True,
+            'runs': self.runs,
+            'shed': self.shed,
+            'cost_ms': round(self.cost * 1000, 2) if self.cost is not None else None
+        }
+
+
+class InferenceScheduler:
+    """Owns the model stages of an engine and runs each on the newest frame within a CPU budget.
+
+    Every task gets its own thread, so a slow low-priority model never stalls
+    hand tracking, and all of them read the same FrameRing. Model time is
+    accounted over a sliding window; once it would exceed cpu_budget (seconds
+    of model time per second, i.e. cores), tasks with priority > 0 are shed,
+    the lowest priority first, until there is room again.
+    """
+
+    def __init__(self, frames, cpu_budget=1.0, window=2.0, headroom=0.1, metrics=None):
+        self.frames = frames
+        self.cpu_budget = cpu_budget
+        self.window = window
+        self.headroom = headroom  # Each priority step below 1 gets this much less of the budget
+        self.metrics = metrics
+        self.tasks = {}
+        self.busy = deque()  # (finished_at, seconds) of recent model runs
+        self.lock = threading.Lock()
+        self.is_running = False
+
+    def register(self, name, run, priority=0, target_fps=None, active=None, prepare=None):
+        task = ModelTask(name, run, priority, target_fps, active, prepare)
+        self.tasks[name] = task
+        return task
+
+    def start(self):
+        self.is_running = True
+        for task in self.tasks.values():
+            task.thread = threading.Thread(target=self._loop, args=(task,), daemon=True)
+            task.thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stops the task threads, letting each finish the frame it is working on."""
+        self.is_running = False
+        self.frames.wake_all()
+        for task in self.tasks.values():
+            if task.thread is not None and task.thread is not threading.current_thread():
+                task.thread.join(timeout=timeout)
+
+    def utilization(self, now=None):
+        """Model time per second over the window (1.0 = one core busy)."""
+        now = now or time.time()
+        with self.lock:
+            while self.busy and now - self.busy[0][0] > self.window:
+                self.busy.popleft()
+            return sum(seconds for _, seconds in self.busy) / self.window
+
+    def _admit(self, task, now):
+        if task.priority == 0:
+            return True
+        limit = self.cpu_budget * (1.0 - self.headroom * (task.priority - 1))
+        expected = (task.cost or 0.0) / self.window
+        return self.utilization(now) + expected <= limit
+
+    def _loop(self, task):
+        while self.is_running:
+            if task.active is not None and not task.active():
+                time.sleep(0.1)
+                continue
+            rate = task.rate()
+            if rate:
+                wait = task.last_run_at + 1.0 / rate - time.time()
+                if wait > 0:
+                    time.sleep(min(wait, 0.5))
+                    continue
+            if task.prepare is not None:
+                try:
+                    task.prepare()
+                except Exception as e:
+                    print(f"Engine {task.name} prepare error: {e}")
+
+            with self.frames.lease_newer(task.last_seq, timeout=0.5) as latest:
+                if latest is None:
+                    continue
+                seq, timestamp, img = latest
+                now = time.time()
+                task.last_seq = seq
+                task.last_run_at = now
+                if not self._admit(task, now):
+                    # Over budget: skip this frame and try again at the next due time. The cost estimate
+                    # decays with every shed, so one slow outlier run cannot keep the task shed for good
+                    task.shed += 1
+                    if task.cost is not None:
+                        task.cost *= 0.8
+                    if self.metrics is not None:
+                        self.metrics.count(f'shed_{task.name}')
+                    continue
+
+                t0 = time.perf_counter()
+                try:
+                    task.run(seq, timestamp, img)
+                except Exception as e:
+                    print(f"Engine {task.name} error: {e}")
+                seconds = time.perf_counter() - t0
+
+            with self.lock:
+                self.busy.append((time.time(), seconds))
+            task.cost = seconds if task.cost is None else 0.8 * task.cost + 0.2 * seconds
+            task.runs += 1
+
+    def status(self):
+        return {
+            'cpu_budget': self.cpu_budget,
+            'utilization': round(self.utilization(), 3),
+            'tasks': {name: task.status() for name, task in self.tasks.items()}
+        }
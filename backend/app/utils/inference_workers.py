@@ -0,0 +1,210 @@
+import multiprocessing as mp_proc
+from multiprocessing import shared_memory
+import numpy as np
+import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+
+
+def _worker_main(kind, options, conn):
+    """Child process: owns one MediaPipe model and serves frames passed through shared memory."""
+    try:
+        if kind == 'hands':
+            from app.utils.hand_tracking import HandDetector
+            model = HandDetector(**options)
+        else:
+            from app.utils.pose_analyzer import PoseAnalyzer
+            model = PoseAnalyzer(**options)
+    except Exception as e:
+        conn.send(('error', str(e)))
+        return
+    conn.send(('ready', None))
+
+    shm = None
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        shm_name, shape, dtype, call = job
+        try:
+            if shm is None or shm.name != shm_name:
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+            frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+            if kind == 'hands':
+                lst = model.getPosition(frame, indexes=range(21), **call)
+                hand = model.lastHand
+                landmarks = [(lm.x, lm.y, lm.z) for lm in hand.landmark] if hand is not None else None
+                conn.send(('ok', (lst, landmarks)))
+            else:
+                lms = model.detect(frame, **call)
+                landmarks = [(lm.x, lm.y, lm.z, lm.visibility) for lm in lms] if lms else None
+                conn.send(('ok', landmarks))
+            del frame
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+    if shm is not None:
+        shm.close()
+    model.close()
+
+
+class InferenceWorker:
+    """One model running in its own process, fed frames through a shared-memory buffer.
+
+    Calls are synchronous from the caller's point of view, but the model runs
+    outside this process' GIL, so several engines/models scale with cores.
+    """
+
+    def __init__(self, kind, options=None, timeout=5.0, start_timeout=60.0):
+        self.kind = kind
+        self.options = options or {}
+        self.timeout = timeout
+        self.start_timeout = start_timeout  # Model build, including a first-use download
+        self.process = None
+        self.conn = None
+        self.shm = None
+
+    def _ensure_started(self):
+        if self.process is not None and self.process.is_alive():
+            return
+        if self.process is not None:
+            print(f"Inference worker '{self.kind}' died, restarting")
+        # spawn: never fork a process that already has camera/model threads running
+        ctx = mp_proc.get_context('spawn')
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(self.kind, self.options, child_conn), daemon=True)
+        self.process.start()
+        # Wait for the model to be built, so a failure surfaces here rather than as a dead pipe later
+        status, result = self.conn.recv() if self.conn.poll(self.start_timeout) else ('error', 'start timed out')
+        if status != 'ready':
+            self.close()
+            raise RuntimeError(f"Inference worker '{self.kind}' failed to start: {result}")
+
+    def start(self):
+        self._ensure_started()
+
+    def _ensure_buffer(self, nbytes):
+        if self.shm is None or self.shm.size < nbytes:
+            self._release_buffer()
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+
+    def run(self, frame, **call):
+        """Copies frame into shared memory and waits for the worker's answer. call = extra model kwargs."""
+        self._ensure_started()
+        self._ensure_buffer(frame.nbytes)
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.shm.buf)[...] = frame
+        self.conn.send((self.shm.name, frame.shape, frame.dtype.str, call))
+        if not self.conn.poll(self.timeout):
+            # Stuck worker: kill it, a fresh one is spawned on the next call
+            self.process.kill()
+            raise RuntimeError(f"Inference worker '{self.kind}' timed out")
+        status, result = self.conn.recv()
+        if status != 'ok':
+            raise RuntimeError(f"Inference worker '{self.kind}' failed: {result}")
+        return result
+
+    def _release_buffer(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        if self.process is not None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+                self.process.join(timeout=2.0)
+            except (BrokenPipeError, OSError):
+                pass
+            if self.process.is_alive():
+                self.process.kill()
+        self.process = None
+        self._release_buffer()
+
+
+def _landmark_list(points):
+    """Rebuilds a NormalizedLandmarkList so drawing and evaluation code work unchanged."""
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for point in points:
+        lm = landmark_list.landmark.add()
+        lm.x, lm.y, lm.z = point[0], point[1], point[2]
+        if len(point) > 3:
+            lm.visibility = point[3]
+    return landmark_list
+
+
+class RemoteHandDetector:
+    """HandDetector look-alike whose model runs in a worker process."""
+
+    def __init__(self, **options):
+        self.worker = InferenceWorker('hands', options)
+        self.mpHands = mp.solutions.hands
+        self.mpDraw = mp.solutions.drawing_utils
+        self.lastHand = None
+
+    def getPosition(self, img, indexes=range(21), hand_no=0, draw=False, rgb=False, frameSize=None):
+        lst, landmarks = self.worker.run(img, rgb=rgb, frameSize=frameSize)
+        self.lastHand = _landmark_list(landmarks) if landmarks else None
+        if draw and self.lastHand is not None:
+            self.drawHand(img)
+        return [pt for i, pt in enumerate(lst) if i in indexes]
+
+    def start(self):
+        """Starts (or restarts) the worker ahead of the first frame."""
+        self.worker.start()
+
+    def setComplexity(self, modelComplexity):
+        """Moves to a worker running the model at another complexity. The old worker keeps
+        serving if the new one fails to start; the error is raised."""
+        if self.modelComplexity == modelComplexity:
+            return
+        worker = InferenceWorker('hands', dict(self.worker.options, modelComplexity=modelComplexity))
+        worker.start()
+        self.worker.close()
+        self.worker = worker
+
+    @property
+    def modelComplexity(self):
+        return self.worker.options.get('modelComplexity', 0)
+
+    def drawHand(self, img, hand=None):
+        hand = hand if hand is not None else self.lastHand
+        if hand is not None:
+            self.mpDraw.draw_landmarks(img, hand, self.mpHands.HAND_CONNECTIONS)
+
+    def close(self):
+        self.worker.close()
+
+
+class RemotePoseAnalyzer:
+    """PoseAnalyzer look-alike whose model runs in a worker process."""
+
+    def __init__(self, **options):
+        self.worker = InferenceWorker('pose', options)
+
+    def detect(self, frame, rgb=False):
+        landmarks = self.worker.run(frame, rgb=rgb)
+        return _landmark_list(landmarks).landmark if landmarks else None
+
+    def start(self):
+        """Starts (or restarts) the worker ahead of the first frame."""
+        self.worker.start()
+
+    def set_complexity(self, model_complexity):
+        """Moves to a worker running the model at another complexity. The old worker keeps
+        serving if the new one fails to start; the error is raised."""
+        if self.model_complexity == model_complexity:
+            return
+        worker = InferenceWorker('pose', dict(self.worker.options, model_complexity=model_complexity))
+        worker.start()
+        self.worker.close()
+        self.worker = worker
+
+    @property
+    def model_complexity(self):
+        return self.worker.options.get('model_complexity', 1)
+
+    def close(self):
+        self.worker.close()
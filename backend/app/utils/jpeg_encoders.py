@@ -0,0 +1,191 @@
+import io
+import time
+import cv2
+import numpy as np
+
+SUBSAMPLING = ('444', '422', '420')
+
+
+class JpegEncoder:
+    """Encodes BGR frames to JPEG. Backends differ in speed; output is interchangeable.
+
+    encode() returns a bytes-like object (bytes or a uint8 numpy buffer).
+    """
+
+    name = 'base'
+
+    def __init__(self, subsampling='420', optimize=False):
+        if subsampling not in SUBSAMPLING:
+            raise ValueError(f"subsampling must be one of {SUBSAMPLING}")
+        self.subsampling = subsampling
+        self.optimize = optimize
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def encode(self, img, quality=70):
+        raise NotImplementedError
+
+    def describe(self):
+        return {'backend': self.name, 'subsampling': self.subsampling, 'optimize': self.optimize}
+
+
+class OpenCVEncoder(JpegEncoder):
+    name = 'opencv'
+
+    def __init__(self, subsampling='420', optimize=False):
+        super().__init__(subsampling, optimize)
+        self.params = []
+        if optimize:
+            self.params += [cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+        # Sampling factor control needs OpenCV >= 4.5.5; older builds always use 4:2:0
+        factor = getattr(cv2, f'IMWRITE_JPEG_SAMPLING_FACTOR_{subsampling}', None)
+        if factor is not None:
+            self.params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, factor]
+
+    def encode(self, img, quality=70):
+        ret, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality] + self.params)
+        return buffer if ret else None
+
+
+class PILEncoder(JpegEncoder):
+    name = 'pil'
+
+    @classmethod
+    def available(cls):
+        try:
+            import PIL.Image  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def __init__(self, subsampling='420', optimize=False):
+        super().__init__(subsampling, optimize)
+        from PIL import Image
+        self.Image = Image
+
+    def encode(self, img, quality=70):
+        image = self.Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        out = io.BytesIO()
+        image.save(out, 'JPEG', quality=quality, optimize=self.optimize,
+                   subsampling=SUBSAMPLING.index(self.subsampling))
+        return out.getvalue()
+
+
+class TurboJPEGEncoder(JpegEncoder):
+    """libjpeg-turbo through PyTurboJPEG (needs the libturbojpeg shared library)."""
+
+    name = 'turbojpeg'
+
+    @classmethod
+    def available(cls):
+        try:
+            from turbojpeg import TurboJPEG
+            TurboJPEG()
+            return True
+        except Exception:
+            return False
+
+    def __init__(self, subsampling='420', optimize=False):
+        super().__init__(subsampling, optimize)
+        import turbojpeg
+        self.tj = turbojpeg
+        self.jpeg = turbojpeg.TurboJPEG()
+        self.sampling = getattr(turbojpeg, f'TJSAMP_{subsampling}')
+        self.flags = turbojpeg.TJFLAG_OPTIMIZE if optimize and hasattr(turbojpeg, 'TJFLAG_OPTIMIZE') else 0
+
+    def encode(self, img, quality=70):
+        return self.jpeg.encode(img, quality=quality, pixel_format=self.tj.TJPF_BGR,
+                                jpeg_subsample=self.sampling, flags=self.flags)
+
+
+class SimpleJpegEncoder(JpegEncoder):
+    """libjpeg-turbo through the simplejpeg wheel (bundles its own libjpeg-turbo)."""
+
+    name = 'simplejpeg'
+
+    @classmethod
+    def available(cls):
+        try:
+            import simplejpeg  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def __init__(self, subsampling='420', optimize=False):
+        super().__init__(subsampling, optimize)
+        import simplejpeg
+        self.simplejpeg = simplejpeg
+
+    def encode(self, img, quality=70):
+        if not img.flags['C_CONTIGUOUS']:
+            img = np.ascontiguousarray(img)
+        return self.simplejpeg.encode_jpeg(img, quality=quality, colorspace='BGR',
+                                           colorsubsampling=self.subsampling, fastdct=not self.optimize)
+
+
+ENCODERS = {cls.name: cls for cls in (OpenCVEncoder, PILEncoder, TurboJPEGEncoder, SimpleJpegEncoder)}
+
+
+def _psnr(original, jpeg):
+    decoded = cv2.imdecode(np.frombuffer(memoryview(jpeg), np.uint8), cv2.IMREAD_COLOR)
+    if decoded is None or decoded.shape != original.shape:
+        return 0.0
+    mse = np.mean((original.astype(np.float32) - decoded.astype(np.float32)) ** 2)
+    return float('inf') if mse == 0 else float(10 * np.log10(255.0 ** 2 / mse))
+
+
+def benchmark_encoders(sample, quality=70, subsampling='420', optimize=False, rounds=10, names=None):
+    """Encodes sample with every available backend. Returns a list of result dicts, fastest first."""
+    results = []
+    for name in names or ENCODERS:
+        cls = ENCODERS[name]
+        if not cls.available():
+            continue
+        try:
+            encoder = cls(subsampling, optimize)
+            jpeg = encoder.encode(sample, quality)  # Warm-up
+            times = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                jpeg = encoder.encode(sample, quality)
+                times.append(time.perf_counter() - t0)
+            results.append({
+                'encoder': encoder,
+                'backend': name,
+                'median_ms': round(float(np.median(times)) * 1000, 3),
+                'bytes': len(memoryview(jpeg).cast('B')),
+                'psnr': round(_psnr(sample, jpeg), 2)
+            })
+        except Exception as e:
+            print(f"JPEG encoder '{name}' failed benchmark: {e}")
+    return sorted(results, key=lambda r: r['median_ms'])
+
+
+def select_encoder(sample, quality=70, subsampling='420', optimize=False, max_bytes=None, min_psnr=30.0):
+    """Picks the fastest backend whose output on sample meets the size/quality target.
+
+    Falls back to OpenCV when nothing qualifies. Returns (encoder, benchmark results).
+    """
+    results = benchmark_encoders(sample, quality, subsampling, optimize)
+    for result in results:
+        if result['psnr'] >= min_psnr and (max_bytes is None or result['bytes'] <= max_bytes):
+            return result['encoder'], results
+    return OpenCVEncoder(subsampling, optimize), results
+
+
+def make_encoder(name='auto', sample=None, quality=70, subsampling='420', optimize=False, max_bytes=None):
+    """Builds the configured encoder; 'auto' runs select_encoder on sample (OpenCV if no sample)."""
+    if name == 'auto':
+        if sample is None:
+            return OpenCVEncoder(subsampling, optimize)
+        encoder, results = select_encoder(sample, quality, subsampling, optimize, max_bytes)
+        summary = ', '.join(f"{r['backend']} {r['median_ms']}ms/{r['bytes'] // 1024}KB" for r in results)
+        print(f"JPEG encoder auto-selected: {encoder.name} ({summary})")
+        return encoder
+    cls = ENCODERS.get(name)
+    if cls is None or not cls.available():
+        print(f"JPEG encoder '{name}' unavailable, using opencv")
+        return OpenCVEncoder(subsampling, optimize)
+    return cls(subsampling, optimize)
@@ -0,0 +1,99 @@
+import math
+import numpy as np
+
+
+class OneEuroFilter:
+    """One-Euro filter over a whole landmark array at once (e.g. 21x2 hand points).
+
+    Smooths jitter at low speed and follows quickly at high speed; the
+    filtered derivative doubles as a velocity estimate for prediction.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self):
+        self.x, self.dx, self.t = None, None, None
+
+    def __call__(self, x, t):
+        x = np.asarray(x, dtype=np.float64)
+        if self.x is None or self.x.shape != x.shape:
+            self.x, self.dx, self.t = x.copy(), np.zeros_like(x), t
+            return self.x
+        dt = max(t - self.t, 1e-6)
+        dx = (x - self.x) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.dx = a_d * dx + (1 - a_d) * self.dx
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self.x = a * x + (1 - a) * self.x
+        self.t = t
+        return self.x
+
+
+class LandmarkPredictor:
+    """Fills the frames between hand-model runs with constant-velocity predictions.
+
+    update() feeds a real detection through the One-Euro filter; predict()
+    extrapolates every landmark from the filtered estimate with the filtered velocity, so
+    detected and predicted frames come from one estimate and never step back. A prediction is
+    refused (forcing a re-detection) when it would move points further than
+    max_shift px since the last detection, is older than max_age seconds, or
+    when the last prediction missed the following detection by more than
+    max_error px.
+    """
+
+    def __init__(self, max_shift=40.0, max_error=12.0, max_age=0.25, min_cutoff=1.0, beta=0.02, d_cutoff=5.0):
+        self.filter = OneEuroFilter(min_cutoff=min_cutoff, beta=beta, d_cutoff=d_cutoff)
+        self.max_shift = max_shift
+        self.max_error = max_error
+        self.max_age = max_age
+        self.last_error = 0.0
+        self.last_t = None
+        self.predicted = None  # Last prediction, compared against the next filtered detection
+
+    def reset(self):
+        self.filter.reset()
+        self.last_t = None
+        self.predicted = None
+        self.last_error = 0.0
+
+    def update(self, points, t):
+        """Feeds a detection ((x, y) list). Returns the filtered points as int tuples."""
+        filtered = self.filter(np.asarray(points, dtype=np.float64), t)
+        # Error of the last prediction against this detection's estimate; without one there is nothing to distrust
+        if self.predicted is not None and self.predicted.shape == filtered.shape:
+            self.last_error = float(np.abs(self.predicted - filtered).max())
+        else:
+            self.last_error = 0.0
+        self.predicted = None
+        self.last_t = t
+        return self._as_list(filtered)
+
+    def predict(self, t):
+        """Predicted points for time t, or None when a real detection is needed."""
+        if self.last_t is None or self.filter.x is None:
+            return None
+        dt = t - self.last_t
+        if dt > self.max_age or self.last_error > self.max_error:
+            return None
+        shift = self.filter.dx * dt
+        if np.abs(shift).max() > self.max_shift:
+            return None
+        self.predicted = self.filter.x + shift
+        return self._as_list(self.predicted)
+
+    @staticmethod
+    def _as_list(points):
+        return [(int(round(x)), int(round(y))) for x, y in points]
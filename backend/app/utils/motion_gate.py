@@ -0,0 +1,83 @@
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Cheap scene-change check that lets the hand model skip frames of a static scene.
+
+    Each frame is shrunk to a tiny grayscale thumbnail and compared, vectorized,
+    with the thumbnail of the last frame the model actually ran on (so slow drift
+    adds up instead of slipping through). A frame counts as motion when more than
+    `area` of its pixels changed by over `pixel_threshold` levels. Motion frames
+    always pass, and so does everything for `hold` seconds after the last motion;
+    a static scene is still sampled at static_fps so state never goes stale.
+    """
+
+    def __init__(self, enabled=True, size=(64, 48), pixel_threshold=15, area=0.002, hold=0.5, static_fps=1.0):
+        self.enabled = enabled
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.area = area
+        self.hold = hold
+        self.static_fps = static_fps
+        self.small = None
+        self.gray = None
+        self.diff = None
+        self.reference = None  # Thumbnail of the last frame that was let through
+        self.last_motion_at = 0.0
+        self.last_pass_at = 0.0
+        self.passed = 0
+        self.skipped = 0
+        self.last_changed = 0.0
+
+    def _thumbnail(self, img):
+        self.small = cv2.resize(img, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        if self.small.ndim == 3:
+            self.gray = cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+            return self.gray
+        return self.small
+
+    def allow(self, img, now=None):
+        """True if the model should run on img (a BGR frame)."""
+        if not self.enabled:
+            return True
+        now = now or time.time()
+        thumb = self._thumbnail(img)
+        if self.reference is None or self.reference.shape != thumb.shape:
+            return self._pass(thumb, now, motion=True)
+
+        self.diff = cv2.absdiff(thumb, self.reference, dst=self.diff)
+        self.last_changed = np.count_nonzero(self.diff > self.pixel_threshold) / self.diff.size
+        if self.last_changed > self.area:
+            return self._pass(thumb, now, motion=True)
+        if now - self.last_motion_at <= self.hold:
+            return self._pass(thumb, now)
+        if self.static_fps and now - self.last_pass_at >= 1.0 / self.static_fps:
+            return self._pass(thumb, now)
+        self.skipped += 1
+        return False
+
+    def _pass(self, thumb, now, motion=False):
+        if self.reference is None or self.reference.shape != thumb.shape:
+            self.reference = thumb.copy()
+        else:
+            np.copyto(self.reference, thumb)
+        if motion:
+            self.last_motion_at = now
+        self.last_pass_at = now
+        self.passed += 1
+        return True
+
+    def reset(self):
+        """Forgets the reference frame, so the next frame always passes."""
+        self.reference = None
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'static': time.time() - self.last_motion_at > self.hold,
+            'changed': round(float(self.last_changed), 4),
+            'passed': self.passed,
+            'skipped': self.skipped
+        }
@@ -3,16 +3,37 @@ import mediapipe as mp
 import numpy as np
 
 class PoseAnalyzer:
-    def __init__(self):
+    def __init__(self, model_complexity=1):
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
+        self.model_complexity = model_complexity
+        self.pose = self._create_pose()
+        self.mp_draw = mp.solutions.drawing_utils
+
+    def _create_pose(self):
+        return self.mp_pose.Pose(
             static_image_mode=False,
-            model_complexity=1,
+            model_complexity=self.model_complexity,
             smooth_landmarks=True,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        self.mp_draw = mp.solutions.drawing_utils
+
+    def set_complexity(self, model_complexity):
+        """Rebuilds the model at another complexity (0 = lite, 1 = full, 2 = heavy). Call from the thread that runs it."""
+        if model_complexity == self.model_complexity:
+            return
+        previous = self.model_complexity
+        self.model_complexity = model_complexity
+        try:
+            pose = self._create_pose()  # Built before the old one goes: the heavy/lite models may need a download
+        except Exception:
+            self.model_complexity = previous
+            raise
+        self.pose.close()
+        self.pose = pose
+
+    def close(self):
+        self.pose.close()
 
     def analyze_frame(self, frame, step="FRONT", selected_upper=False, selected_lower=False):
         """
@@ -22,21 +43,34 @@ class PoseAnalyzer:
         if frame is None:
             return {"status": "error", "feedback": "No frame provided"}
 
-        img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return self.evaluate(self.detect(frame), step, selected_upper, selected_lower)
+
+    def detect(self, frame, rgb=False):
+        """Runs the pose model on a BGR frame (or an RGB model input with rgb=True).
+
+        Returns the landmark list, or None if nobody is visible.
+        """
+        img_rgb = frame if rgb else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = self.pose.process(img_rgb)
-        
-        h, w, c = frame.shape
+        if not results.pose_landmarks:
+            return None
+        return results.pose_landmarks.landmark
+
+    @staticmethod
+    def evaluate(lms, step="FRONT", selected_upper=False, selected_lower=False):
+        """
+        Turns detected landmarks into capture feedback. Cheap, so it can be re-run per request
+        on a cached detection.
+        """
         feedback = []
         is_ready = True
         
-        if not results.pose_landmarks:
+        if not lms:
             return {
                 "status": "waiting",
                 "feedback": "Step into the frame",
                 "parts_visible": 0
             }
-
-        lms = results.pose_landmarks.landmark
         
         # 1. Determine Key Points Visibility requirements based on step
         # Front/Left/Right usually need some face parts, but BACK strictly does not.
@@ -116,5 +150,3 @@ class PoseAnalyzer:
             "visible_ratio": visible_count / min_required,
             "landmarks": [[lm.x, lm.y, lm.visibility] for lm in lms]
         }
-
-pose_analyzer = PoseAnalyzer()
@@ -0,0 +1,132 @@
+import time
+import cv2
+from app.utils.frame_broadcaster import FrameBroadcaster
+from app.utils.jpeg_encoders import OpenCVEncoder
+
+
+class Rendition:
+    """A named output of the camera stream (size, JPEG quality, fps cap, landmark overlay).
+
+    Each rendition owns a FrameBroadcaster and is only encoded while it has
+    subscribers, at most once per captured frame. Overlay renditions are fed
+    a separately drawn copy; the others encode the clean frame directly.
+    Passthrough renditions are never encoded: they forward the camera's own
+    JPEG bytes (unmirrored) via publish_encoded().
+    """
+
+    def __init__(self, name, scale=1.0, quality=70, max_fps=None, fallback=None, overlay=False, passthrough=False):
+        self.name = name
+        self.scale = scale
+        self.quality = quality
+        self.max_fps = max_fps
+        self.overlay = overlay
+        self.passthrough = passthrough
+        self.fallback = fallback  # Name of the next cheaper rendition, used for adaptive downgrade
+        self.broadcaster = FrameBroadcaster()
+        self.last_published = 0.0
+        self.resize_buf = None
+        self.encoder = OpenCVEncoder()  # Swapped for the engine's selected backend on start
+
+    def is_active(self):
+        return self.broadcaster.subscriber_count() > 0
+
+    def is_due(self, now=None):
+        """True if the rendition has viewers and its fps cap allows another frame."""
+        if not self.is_active():
+            return False
+        if not self.max_fps:
+            return True
+        now = now or time.time()
+        return now - self.last_published >= 1.0 / self.max_fps
+
+    def encode(self, img):
+        """Resizes (if needed) and JPEG-encodes img. Returns the encoded buffer (bytes-like) or None."""
+        if self.scale != 1.0:
+            h, w = img.shape[:2]
+            size = (int(w * self.scale), int(h * self.scale))
+            if self.resize_buf is None or self.resize_buf.shape[:2] != (size[1], size[0]):
+                self.resize_buf = None
+            # Resize into a buffer reused across frames
+            self.resize_buf = cv2.resize(img, size, dst=self.resize_buf, interpolation=cv2.INTER_AREA)
+            img = self.resize_buf
+        return self.encoder.encode(img, self.quality)
+
+    def publish(self, img, timestamp=None, frame_seq=None):
+        jpeg = self.encode(img)
+        if jpeg is None:
+            return None
+        return self.publish_encoded(jpeg, timestamp, frame_seq)
+
+    def publish_encoded(self, jpeg, timestamp=None, frame_seq=None):
+        """Publishes already encoded JPEG bytes as they are."""
+        self.last_published = time.time()
+        return self.broadcaster.publish(jpeg, timestamp, frame_seq)
+
+
+def rendition_name(name, overlay=False):
+    """Key of the overlay variant of a rendition ('kiosk' -> 'kiosk_overlay')."""
+    return f'{name}_overlay' if overlay else name
+
+
+def default_renditions():
+    """Full kiosk mirror, half-res dashboard preview and a low-fps thumbnail, each clean and with overlay.
+
+    Plus 'camera', the MJPG camera's own bytes (only fed when the source runs in passthrough mode).
+    """
+    specs = [
+        ('kiosk', dict(scale=1.0, quality=70, fallback='preview')),
+        ('preview', dict(scale=0.5, quality=60, fallback='thumbnail')),
+        ('thumbnail', dict(scale=0.25, quality=50, max_fps=5)),
+    ]
+    renditions = []
+    for overlay in (False, True):
+        for name, options in specs:
+            options = dict(options)
+            if options.get('fallback'):
+                options['fallback'] = rendition_name(options['fallback'], overlay)
+            renditions.append(Rendition(rendition_name(name, overlay), overlay=overlay, **options))
+    renditions.append(Rendition('camera', passthrough=True))
+    return {r.name: r for r in renditions}
+
+
+class AdaptiveStream:
+    """Per-client MJPEG stream that steps down to a cheaper rendition when the client falls behind.
+
+    A client is considered slow when, over a window of delivered frames, more
+    frames were skipped (published while it was still writing) than sent.
+    """
+
+    def __init__(self, renditions, name, adaptive=True, window=30, max_skip_ratio=0.5):
+        self.renditions = renditions
+        self.rendition = renditions[name]
+        self.adaptive = adaptive
+        self.window = window
+        self.max_skip_ratio = max_skip_ratio
+        self.sub = self.rendition.broadcaster.subscribe()
+        self.last_timestamp = None  # Capture time of the frame last returned by next_part()
+
+    def next_part(self, timeout=1.0):
+        part = self.sub.next_part(timeout=timeout)
+        if part is not None:
+            # Taken before a downgrade swaps in a fresh subscription that has not returned anything yet
+            self.last_timestamp = self.sub.last_timestamp
+            if self.adaptive:
+                self._maybe_downgrade()
+        return part
+
+    def _maybe_downgrade(self):
+        sent, skipped = self.sub.sent, self.sub.skipped
+        if sent < self.window or not self.rendition.fallback:
+            return
+        if skipped / float(sent + skipped) > self.max_skip_ratio:
+            fallback = self.renditions[self.rendition.fallback]
+            print(f"Stream client falling behind on '{self.rendition.name}', stepping down to '{fallback.name}'")
+            self.sub.close()
+            self.rendition = fallback
+            self.sub = fallback.broadcaster.subscribe()
+        else:
+            # Start a fresh measurement window
+            self.sub.sent, self.sub.skipped = 0, 0
+
+    def close(self):
+        self.sub.close()
@@ -0,0 +1,186 @@
+import asyncio
+import fractions
+import threading
+import time
+import cv2
+
+# Optional: pip install aiortc (pulls in PyAV). Without it the WebRTC route reports itself unavailable.
+try:
+    from aiortc import (MediaStreamTrack, RTCConfiguration, RTCPeerConnection, RTCRtpSender,
+                        RTCSessionDescription)
+    from aiortc.mediastreams import MediaStreamError
+    from av import VideoFrame
+except ImportError:
+    MediaStreamTrack = object
+    MediaStreamError = Exception
+    RTCPeerConnection = None
+
+CODECS = {'h264': 'video/H264', 'vp8': 'video/VP8'}
+VIDEO_CLOCK = 90000
+
+
+def webrtc_available():
+    return RTCPeerConnection is not None
+
+
+class ViewerLimitError(RuntimeError):
+    """The kiosk already has max_viewers viewers, counting peers that are still connecting."""
+
+
+class EngineVideoTrack(MediaStreamTrack):
+    """Video track fed from an engine's FrameRing: always the newest clean frame, never a backlog.
+
+    While the encoder is busy newer frames simply replace older ones, so a slow
+    link drops frames instead of adding delay. Timestamps come from the capture time.
+    """
+
+    kind = 'video'
+
+    def __init__(self, engine, scale=1.0, max_fps=None):
+        super().__init__()
+        self.engine = engine
+        self.scale = scale
+        self.max_fps = max_fps
+        self.last_seq = 0
+        self.last_sent_at = 0.0
+        self.started_at = None
+
+    def _next_frame(self):
+        with self.engine.frames.lease_newer(self.last_seq, timeout=1.0) as latest:
+            if latest is None:
+                return None
+            seq, timestamp, img = latest
+            if self.scale != 1.0:
+                img = cv2.resize(img, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            frame = VideoFrame.from_ndarray(img, format='bgr24')  # Copies out of the ring slot
+        self.last_seq = seq
+        return timestamp, frame
+
+    async def recv(self):
+        loop = asyncio.get_running_loop()
+        if self.max_fps:
+            wait = self.last_sent_at + 1.0 / self.max_fps - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        latest = None
+        while latest is None:
+            if self.readyState != 'live':
+                raise MediaStreamError
+            latest = await loop.run_in_executor(None, self._next_frame)
+        timestamp, frame = latest
+
+        if self.started_at is None:
+            self.started_at = timestamp
+        frame.pts = int((timestamp - self.started_at) * VIDEO_CLOCK)
+        frame.time_base = fractions.Fraction(1, VIDEO_CLOCK)
+        self.last_sent_at = time.time()
+        return frame
+
+
+class WebRTCManager:
+    """Answers WebRTC offers for engine live views and keeps the peer connections alive.
+
+    aiortc is asyncio-based, so it gets its own event loop thread; Flask routes call
+    answer() synchronously. Offers are answered without trickle ICE and with no STUN/TURN
+    servers, i.e. host candidates only, which is all a LAN viewer needs. The encoder
+    follows the receiver's bandwidth estimate (REMB), so the bitrate adapts to the link.
+
+    A peer only counts as an engine viewer (and so keeps the camera open) once its
+    connection is up. Peers still connecting do count against max_viewers, and one
+    that is not connected within connect_timeout seconds is closed, so an abandoned
+    offer cannot hold a viewer slot for long.
+    """
+
+    def __init__(self, connect_timeout=30.0):
+        self.connect_timeout = connect_timeout
+        self.loop = None
+        self.thread = None
+        self.peers = {}  # RTCPeerConnection -> kiosk_id
+        self.viewers = set()  # Peers counted in their engine's peer_viewers
+        self.lock = threading.Lock()
+        self.viewer_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def answer(self, engine, sdp, sdp_type='offer', codec='h264', scale=1.0, max_fps=None, timeout=15.0):
+        """Returns the local answer as {'sdp', 'type'} for a browser offer."""
+        if not webrtc_available():
+            raise RuntimeError('WebRTC support requires aiortc (pip install aiortc)')
+        if codec not in CODECS:
+            raise ValueError(f"codec must be one of {', '.join(CODECS)}")
+        future = asyncio.run_coroutine_threadsafe(
+            self._answer(engine, sdp, sdp_type, codec, scale, max_fps), self._ensure_loop())
+        return future.result(timeout=timeout)
+
+    async def _answer(self, engine, sdp, sdp_type, codec, scale, max_fps):
+        with self.viewer_lock:
+            # Checked and registered in one step, so concurrent offers cannot all slip under the limit
+            viewers = engine.subscriber_count() + self._pending(engine.kiosk_id)
+            if engine.max_viewers and viewers >= engine.max_viewers:
+                raise ViewerLimitError('Viewer limit reached for this kiosk')
+            pc = RTCPeerConnection(RTCConfiguration(iceServers=[]))
+            self.peers[pc] = engine.kiosk_id
+        track = EngineVideoTrack(engine, scale=scale, max_fps=max_fps)
+
+        @pc.on('connectionstatechange')
+        async def on_state():
+            if pc.connectionState == 'connected':
+                self._count_viewer(pc, engine)
+            elif pc.connectionState in ('failed', 'closed'):
+                await self._close(pc, track)
+
+        try:
+            # The transceiver must exist before the offer is applied for the codec preference to count
+            transceiver = pc.addTransceiver(track, direction='sendonly')
+            transceiver.setCodecPreferences([c for c in RTCRtpSender.getCapabilities('video').codecs
+                                             if c.mimeType in (CODECS[codec], 'video/rtx')])
+            await pc.setRemoteDescription(RTCSessionDescription(sdp=sdp, type=sdp_type))
+            await pc.setLocalDescription(await pc.createAnswer())  # Gathers all candidates (no trickle)
+        except Exception:
+            await self._close(pc, track)
+            raise
+        asyncio.ensure_future(self._expire(pc, track))
+        return {'sdp': pc.localDescription.sdp, 'type': pc.localDescription.type}
+
+    async def _expire(self, pc, track):
+        """Closes the peer if it has not connected within connect_timeout."""
+        await asyncio.sleep(self.connect_timeout)
+        if pc in self.peers and pc not in self.viewers:
+            print(f"WebRTC peer for kiosk {self.peers[pc]} did not connect within {self.connect_timeout}s, closing")
+            await self._close(pc, track)
+
+    def _count_viewer(self, pc, engine):
+        with self.viewer_lock:
+            if pc in self.peers and pc not in self.viewers:
+                self.viewers.add(pc)
+                engine.peer_viewers += 1
+
+    async def _close(self, pc, track):
+        with self.viewer_lock:
+            if pc in self.viewers:
+                self.viewers.discard(pc)
+                track.engine.peer_viewers -= 1
+            self.peers.pop(pc, None)
+        track.stop()
+        await pc.close()
+
+    def _pending(self, kiosk_id):
+        return sum(1 for pc, k in self.peers.items() if k == kiosk_id and pc not in self.viewers)
+
+    def pending_count(self, kiosk_id):
+        """Peers of kiosk_id that have answered but are not connected (and counted as viewers) yet."""
+        with self.viewer_lock:
+            return self._pending(kiosk_id)
+
+    def peer_count(self, kiosk_id=None):
+        return sum(1 for k in list(self.peers.values()) if kiosk_id is None or k == kiosk_id)
+
+
+webrtc_manager = WebRTCManager()
@@ -0,0 +1,257 @@
+"""
+Gesture/pose pipeline benchmark.
+
+Replays a clip (or any frame source) through the real HandDetector,
+PoseAnalyzer and stream encoder and reports fps plus per-stage latency
+percentiles as JSON, so configurations and releases can be compared.
+
+    python bench_pipeline.py --source video:clips/kiosk.mp4 --frames 300 --output bench.json
+    python bench_pipeline.py --source synthetic --engine     # threaded engine throughput
+    python bench_pipeline.py --latency --max-p95-ms 150      # glass-to-glass check, exits 1 on failure
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+
+from app.utils.frame_sources import make_frame_source, decode_jpeg, read_timecode
+from app.utils.jpeg_encoders import make_encoder
+
+STAGES = ['capture', 'flip', 'color_convert', 'hand_inference', 'landmark_draw', 'pose_inference', 'jpeg_encode']
+
+
+def summarize(samples):
+    """count/mean/p50/p95/p99/max in milliseconds for a list of durations in seconds."""
+    if not samples:
+        return {'count': 0}
+    ms = np.array(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        'count': int(ms.size),
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(ms.max()), 3)
+    }
+
+
+def bench_stages(source, frames, pose_every, quality, warmup, encoder, infer_width=None):
+    """Runs each pipeline stage serially on every frame and times it."""
+    from app.utils.hand_tracking import HandDetector
+    from app.utils.pose_analyzer import PoseAnalyzer
+    from app.utils.gesture_engine import make_model_input
+
+    detector = HandDetector(detectionCon=0.5, trackCon=0.5)
+    pose = PoseAnalyzer() if pose_every else None
+    timings = {stage: [] for stage in STAGES}
+    frame_buf = None
+    processed = 0
+    started = None
+
+    while processed < frames + warmup:
+        t0 = time.perf_counter()
+        success, frame = source.read(frame_buf)
+        t1 = time.perf_counter()
+        if not success:
+            if source.finished:
+                break
+            continue
+        frame_buf = frame
+
+        img = cv2.flip(frame, 1)
+        t2 = time.perf_counter()
+        rgb = make_model_input(img, infer_width)
+        t3 = time.perf_counter()
+        results = detector.hands.process(rgb)
+        t4 = time.perf_counter()
+        if results.multi_hand_landmarks:
+            detector.drawHand(img, results.multi_hand_landmarks[0])
+        t5 = time.perf_counter()
+        run_pose = pose is not None and processed % pose_every == 0
+        if run_pose:
+            pose.pose.process(rgb)
+        t6 = time.perf_counter()
+        encoder.encode(img, quality)
+        t7 = time.perf_counter()
+
+        processed += 1
+        if processed <= warmup:
+            continue
+        if started is None:
+            started = t0
+        timings['capture'].append(t1 - t0)
+        timings['flip'].append(t2 - t1)
+        timings['color_convert'].append(t3 - t2)
+        timings['hand_inference'].append(t4 - t3)
+        timings['landmark_draw'].append(t5 - t4)
+        if run_pose:
+            timings['pose_inference'].append(t6 - t5)
+        timings['jpeg_encode'].append(t7 - t6)
+
+    measured = max(0, processed - warmup)
+    wall = time.perf_counter() - started if started else 0.0
+    return {
+        'mode': 'stages',
+        'frames': measured,
+        'wall_s': round(wall, 3),
+        'fps': round(measured / wall, 2) if wall else 0.0,
+        'stages': {stage: summarize(timings[stage]) for stage in STAGES}
+    }
+
+
+def bench_engine(source, seconds):
+    """Runs the threaded GestureEngine against the source and reports its throughput."""
+    from app.utils.gesture_engine import GestureEngine
+
+    engine = GestureEngine(source=source)
+    if not engine.start():
+        raise RuntimeError('GestureEngine failed to start')
+    engine.get_pose()  # Keep the pose loop active for the whole run
+    started = time.time()
+    try:
+        while engine.is_running and time.time() - started < seconds:
+            time.sleep(0.25)
+            engine.get_pose()
+    finally:
+        wall = time.time() - started
+        engine.stop()
+
+    metrics = engine.get_metrics()
+    counters = metrics['counters']
+    return {
+        'mode': 'engine',
+        'wall_s': round(wall, 3),
+        'captured_fps': round(counters['captured'] / wall, 2) if wall else 0.0,
+        'inferred_fps': round(counters['processed'] / wall, 2) if wall else 0.0,
+        'frames_captured': counters['captured'],
+        'frames_dropped': counters['dropped'],
+        'frame_times': metrics['frame_times'],
+        'stages': metrics['stages']
+    }
+
+
+def parse_part(part):
+    """Splits one multipart chunk into (headers dict, JPEG bytes)."""
+    head, _, body = bytes(part).partition(b'\r\n\r\n')
+    headers = {}
+    for line in head.decode('latin-1').split('\r\n')[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip()] = value.strip()
+    return headers, body[:-2]
+
+
+def bench_latency(source, seconds, rendition='kiosk', max_p95_ms=None):
+    """Glass-to-glass latency from a timecode source to an MJPEG subscriber.
+
+    Each received frame's capture time is read back from its pixels (read_timecode)
+    and cross-checked against the X-Capture-Time / X-Frame-Seq part headers.
+    """
+    from app.utils.gesture_engine import GestureEngine
+    from app.utils.stream_renditions import AdaptiveStream
+
+    engine = GestureEngine(source=source, mouse_control=False)
+    if not engine.start():
+        raise RuntimeError('GestureEngine failed to start')
+    stream = AdaptiveStream(engine.renditions, rendition, adaptive=False)
+    pixels, headers_lat, seqs = [], [], []
+    unreadable = 0
+    started = time.time()
+    try:
+        while engine.is_running and time.time() - started < seconds:
+            part = stream.next_part(timeout=1.0)
+            received = time.time()
+            if part is None:
+                continue
+            headers, jpeg = parse_part(part)
+            headers_lat.append(received - float(headers['X-Capture-Time']))
+            seqs.append(int(headers['X-Frame-Seq']))
+            stamped = read_timecode(decode_jpeg(jpeg), received)
+            if stamped is None:
+                unreadable += 1
+            else:
+                pixels.append(received - stamped)
+    finally:
+        stream.close()
+        engine.stop()
+
+    report = {
+        'mode': 'latency',
+        'rendition': rendition,
+        'frames': len(seqs),
+        'unreadable_timecodes': unreadable,
+        'seq_increasing': all(b > a for a, b in zip(seqs, seqs[1:])),
+        'glass_to_glass': summarize(pixels),
+        'capture_header_to_receive': summarize(headers_lat),
+        'engine': engine.latency_report()
+    }
+    if max_p95_ms is not None:
+        p95 = report['glass_to_glass'].get('p95_ms')
+        report['passed'] = bool(pixels) and report['seq_increasing'] and p95 <= max_p95_ms
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the gesture/pose pipeline')
+    parser.add_argument('--source',
+                        help='frame source spec, e.g. video:clip.mp4 (replayed as fast as possible); '
+                             'defaults to synthetic, with timecode=1 in latency mode')
+    parser.add_argument('--frames', type=int, default=300, help='frames to measure in stage mode')
+    parser.add_argument('--warmup', type=int, default=10, help='frames to run before measuring')
+    parser.add_argument('--pose-every', type=int, default=1, help='run pose on every Nth frame (0 = never)')
+    parser.add_argument('--quality', type=int, default=70, help='JPEG quality for the encode stage')
+    parser.add_argument('--encoder', default='opencv',
+                        help='JPEG backend for the encode stage: opencv, pil, turbojpeg, simplejpeg')
+    parser.add_argument('--infer-width', type=int, default=320,
+                        help='model input width for the color_convert stage (0 = full frame)')
+    parser.add_argument('--engine', action='store_true', help='measure the threaded engine instead of stages')
+    parser.add_argument('--seconds', type=float, default=10.0, help='run time in engine mode')
+    parser.add_argument('--latency', action='store_true',
+                        help='measure glass-to-glass latency with a timecode source (real-time pacing)')
+    parser.add_argument('--rendition', default='kiosk', help='stream rendition to subscribe to in latency mode')
+    parser.add_argument('--max-p95-ms', type=float, help='latency mode: fail (exit 1) above this p95')
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args(argv)
+
+    spec = args.source or ('synthetic?timecode=1' if args.latency else 'synthetic')
+    # Replays default to as-fast-as-possible unless the spec says otherwise; latency needs real time
+    if 'realtime=' not in spec and not spec.startswith('camera') and not args.latency:
+        spec += ('&' if '?' in spec else '?') + 'realtime=0'
+    source = make_frame_source(spec)
+
+    if args.latency:
+        report = bench_latency(source, args.seconds, args.rendition, args.max_p95_ms)
+    elif args.engine:
+        report = bench_engine(source, args.seconds)
+    else:
+        if not source.open():
+            print(f"Could not open source {args.source}", file=sys.stderr)
+            return 1
+        try:
+            encoder = make_encoder(args.encoder)
+            report = bench_stages(source, args.frames, args.pose_every, args.quality, args.warmup, encoder, args.infer_width)
+        finally:
+            source.release()
+
+    report['source'] = source.describe()
+    report['config'] = {k: v for k, v in vars(args).items() if k != 'output'}
+    report['platform'] = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'opencv': cv2.__version__
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            out.write(text)
+    return 1 if report.get('passed') is False else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Smoke check for the try-on capture routes (GET and POST /api/tryon/capture)
+Runs the app in-process against a synthetic frame source; no camera or server needed
+
+Usage:
+cd backend
+python check_capture.py
+"""
+
+import os
+import sys
+import time
+
+os.environ['CAMERA_SOURCE'] = 'synthetic'
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app
+from app.utils.engine_manager import engine_manager
+
+app = create_app()
+client = app.test_client()
+failures = []
+
+try:
+    ok, error = engine_manager.start()
+    if not ok:
+        sys.exit(f"Engine failed to start: {error}")
+    engine = engine_manager.get()
+    deadline = time.time() + 5
+    while engine.frames.latest() is None and time.time() < deadline:
+        time.sleep(0.05)
+
+    response = client.get('/api/tryon/capture?quality=80')
+    if response.status_code != 200 or response.mimetype != 'image/jpeg' or not response.data:
+        failures.append(f"GET /capture: {response.status_code} {response.mimetype}")
+    else:
+        etag = response.headers.get('ETag')
+        again = client.get('/api/tryon/capture?quality=80', headers={'If-None-Match': etag})
+        if again.status_code not in (200, 304):
+            failures.append(f"GET /capture with If-None-Match: {again.status_code}")
+
+    response = client.post('/api/tryon/capture', json={'quality': 80})
+    data = response.get_json(silent=True) or {}
+    if response.status_code != 200 or not data.get('image_b64'):
+        failures.append(f"POST /capture: {response.status_code} {data.get('error')}")
+
+    for method in (client.get, client.post):
+        response = method('/api/tryon/capture?quality=abc')
+        if response.status_code != 400:
+            failures.append(f"{method.__name__.upper()} /capture?quality=abc: {response.status_code}, expected 400")
+finally:
+    engine_manager.stop_all()
+
+for failure in failures:
+    print(f"FAIL {failure}")
+print("Capture routes OK" if not failures else f"{len(failures)} capture check(s) failed")
+sys.exit(1 if failures else 0)
@@ -1,6 +1,6 @@
 from app import create_app
 
-app = create_app()
-
 if __name__ == '__main__':
+    # Created here, not at import: inference workers are spawned and re-import this module
+    app = create_app()
     app.run(debug=True, port=5000, threaded=True)
@@ -242,6 +242,13 @@ export const gesturesAPI = {
     },
     status: async () => {
         return apiRequest('/gestures/status');
+    },
+    // WebRTC live view: post a complete (non-trickle) offer, apply the returned answer
+    webrtcOffer: async (offer, options = {}) => {
+        return apiRequest('/gestures/webrtc/offer', {
+            method: 'POST',
+            body: JSON.stringify({ sdp: offer.sdp, type: offer.type, ...options }),
+        });
     }
 };
 
@@ -296,10 +303,24 @@ export const tryonAPI = {
             body: JSON.stringify({ token }),
         });
     },
-    capture: async () => {
-        return apiRequest('/tryon/capture', {
-            method: 'POST',
+    capture: async (quality = 95) => {
+        // Binary snapshot of the clean frame; base64 is only built here because /generate still takes it
+        const token = getToken();
+        const response = await fetch(`${API_BASE_URL}/tryon/capture?quality=${quality}`, {
+            headers: token ? { 'Authorization': `Bearer ${token}` } : {},
+        });
+        if (!response.ok) {
+            const data = await response.json().catch(() => ({}));
+            throw new Error(data.error || 'Capture failed');
+        }
+        const blob = await response.blob();
+        const image_b64 = await new Promise((resolve, reject) => {
+            const reader = new FileReader();
+            reader.onloadend = () => resolve(reader.result.split(',')[1]);
+            reader.onerror = reject;
+            reader.readAsDataURL(blob);
         });
+        return { success: true, image_b64, mime: blob.type };
     },
     analyze: async (step = 'FRONT', clothingTypes = {}) => {
         return apiRequest('/tryon/analyze', {